@@ -6,27 +6,803 @@ Manage Claude Code plugins: install, update, remove, check updates
 
 Usage:
     python scripts/plugin_manager.py list
-    python scripts/plugin_manager.py install python-development@1.3.0
-    python scripts/plugin_manager.py check-updates
+    python scripts/plugin_manager.py install python-development@1.3.0 --source https://github.com/wshobson/agents
+    python scripts/plugin_manager.py update python-development
+    python scripts/plugin_manager.py check-updates --mirror ~/mirrors
     python scripts/plugin_manager.py diff-upstream python-development
 
 Version: 1.0.0
 """
 
+import io
+import os
+import re
 import sys
 import json
+import shutil
+import sqlite3
+import difflib
+import hashlib
+import tarfile
 import argparse
-from pathlib import Path
-from typing import Dict, List, Optional
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date
+from pathlib import Path, PurePosixPath
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
 import subprocess
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+def scan_plugin_spans(data: bytes) -> List[Tuple[str, int, int]]:
+    """
+    Locate each entry of the top-level "plugins" array in registry JSON
+
+    Args:
+        data: Raw registry.json bytes (UTF-8)
+
+    Returns:
+        List of (plugin id, byte offset, byte length), in registry order
+
+    Raises:
+        ValueError: If the registry is not a JSON object
+    """
+    text = data.decode("utf-8-sig")
+    bom = len(data) - len(data.lstrip(b"\xef\xbb\xbf"))
+    decoder = json.JSONDecoder()
+    spans = []
+
+    # Char → byte offsets, converted incrementally (spans are increasing)
+    char_pos, byte_pos = 0, bom
+
+    def to_byte(char_index: int) -> int:
+        nonlocal char_pos, byte_pos
+        byte_pos += len(text[char_pos:char_index].encode("utf-8"))
+        char_pos = char_index
+        return byte_pos
+
+    def skip(i: int) -> int:
+        return _WHITESPACE.match(text, i).end()
+
+    try:
+        i = skip(0)
+        if text[i] != "{":
+            raise ValueError("registry is not a JSON object")
+        i = skip(i + 1)
+
+        while text[i] != "}":
+            key, i = decoder.raw_decode(text, i)
+            i = skip(i)
+            if text[i] != ":":
+                raise ValueError(f"expected ':' at char {i}")
+            i = skip(i + 1)
+
+            if key == "plugins" and text[i] == "[":
+                i = skip(i + 1)
+                while text[i] != "]":
+                    start = i
+                    plugin, i = decoder.raw_decode(text, i)
+                    if isinstance(plugin, dict) and "id" in plugin:
+                        begin = to_byte(start)
+                        spans.append((plugin["id"], begin, to_byte(i) - begin))
+                    i = skip(i)
+                    if text[i] == ",":
+                        i = skip(i + 1)
+                i += 1
+            else:
+                _, i = decoder.raw_decode(text, i)
+
+            i = skip(i)
+            if text[i] == ",":
+                i = skip(i + 1)
+    except IndexError:
+        raise ValueError("unexpected end of registry")
+
+    return spans
+
+
+class RegistryIndex:
+    """
+    Plugin id → byte span index over registry.json, cached in SQLite
+
+    The index is rebuilt only when registry.json's mtime or size changes.
+    Lookups read and decode a single plugin entry instead of the whole file.
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, registry_path: Path, cache_path: Path):
+        self.registry_path = registry_path
+        self.cache_path = cache_path
+        self._con: Optional[sqlite3.Connection] = None
+        self._stat: Optional[Tuple[int, int]] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._con is None:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            con = sqlite3.connect(self.cache_path)
+            con.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+                CREATE TABLE IF NOT EXISTS plugins (
+                    id TEXT PRIMARY KEY, offset INTEGER, length INTEGER, position INTEGER
+                );
+            """)
+            self._con = con
+        return self._con
+
+    def _refresh(self) -> sqlite3.Connection:
+        """Rebuild the index if registry.json changed since it was built"""
+        st = self.registry_path.stat()
+        stat = (st.st_mtime_ns, st.st_size)
+        con = self._connect()
+        if stat == self._stat:
+            return con
+
+        meta = dict(con.execute("SELECT key, value FROM meta"))
+        if (meta.get("schema") != self.SCHEMA_VERSION
+                or (meta.get("mtime_ns"), meta.get("size")) != stat):
+            spans = scan_plugin_spans(self.registry_path.read_bytes())
+            with con:
+                con.execute("DELETE FROM plugins")
+                con.executemany(
+                    "INSERT OR IGNORE INTO plugins VALUES (?, ?, ?, ?)",
+                    [(pid, offset, length, n) for n, (pid, offset, length) in enumerate(spans)]
+                )
+                con.executemany(
+                    "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                    [("schema", self.SCHEMA_VERSION), ("mtime_ns", stat[0]), ("size", stat[1])]
+                )
+        self._stat = stat
+        return con
+
+    def get(self, plugin_id: str) -> Optional[Dict]:
+        """Materialize a single plugin entry, or None if not in the registry"""
+        if not self.registry_path.exists():
+            return None
+        row = self._refresh().execute(
+            "SELECT offset, length FROM plugins WHERE id = ?", (plugin_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        offset, length = row
+        with open(self.registry_path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length).decode("utf-8"))
+
+    def ids(self) -> List[str]:
+        """All plugin ids in registry order"""
+        if not self.registry_path.exists():
+            return []
+        return [pid for (pid,) in self._refresh().execute(
+            "SELECT id FROM plugins ORDER BY position")]
+
+    def close(self):
+        if self._con is not None:
+            self._con.close()
+            self._con = None
+            self._stat = None
+
+
+def _github_repository(url: str) -> Optional[str]:
+    """"owner/name" for a GitHub repository URL"""
+    match = re.match(r"https?://github\.com/([^/]+/[^/]+?)(?:\.git)?/?$", url)
+    return match.group(1) if match else None
+
+
+class UpdateCheckError(Exception):
+    """Upstream could not be checked"""
+
+
+class CorruptObjectError(OSError):
+    """Stored object content no longer matches its hash"""
+
+
+class UpdateSource:
+    """
+    Upstream backend for update checks
+
+    A source locates a plugin's upstream, probes it for a cheap validator
+    (commit SHA, ETag) and fetches the upstream marketplace manifest
+    (``.claude-plugin/marketplace.json``) only when the validator changed.
+    """
+
+    name = "base"
+    # Sources that can only serve their current state set this to False
+    versioned = True
+
+    def locate(self, plugin: Dict) -> Optional[str]:
+        """Upstream location for plugin, or None if this source cannot serve it"""
+        raise NotImplementedError
+
+    def probe(self, location: str, ref: str) -> str:
+        """Cheap validator for the upstream state at ref"""
+        raise NotImplementedError
+
+    def fetch(self, location: str, ref: str, validator: str) -> Dict:
+        """Marketplace manifest for the upstream state identified by validator"""
+        raise NotImplementedError
+
+    def resolve(self, location: str, ref: str, version: str) -> str:
+        """Validator of the upstream state providing version ("latest" → ref)"""
+        raise NotImplementedError
+
+    def export(self, location: str, validator: str, path: str, tmp_dir: Path) -> Path:
+        """
+        Directory holding the plugin files at ``path`` for that state
+
+        Sources may write into ``tmp_dir`` or return an existing directory.
+        """
+        raise NotImplementedError
+
+    def snapshot(self, location: str, validator: str, path: str,
+                 hashes: "FileHashCache") -> Tuple[str, Dict[str, str], Callable[[str], bytes]]:
+        """
+        File hashes of the plugin at ``path`` without a full export
+
+        Returns:
+            (hash algorithm, relative path → hash, reader for file contents)
+        """
+        raise NotImplementedError
+
+
+class GitMirrorSource(UpdateSource):
+    """
+    Local git mirror of upstream repositories
+
+    ``owner/name`` (from ``upstream.repository`` or a GitHub ``source.url``)
+    resolves to ``<root>/owner/name.git`` or ``<root>/owner/name``; the
+    validator is the commit SHA of the plugin's ref.
+    """
+
+    name = "git-mirror"
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def locate(self, plugin: Dict) -> Optional[str]:
+        repository = (plugin.get("upstream", {}).get("repository")
+                      or _github_repository(plugin.get("source", {}).get("url", "")))
+        if not repository:
+            return None
+
+        for candidate in (self.root / f"{repository}.git", self.root / repository):
+            if candidate.is_dir():
+                return str(candidate)
+        return None
+
+    def _git(self, location: str, *args: str) -> str:
+        result = subprocess.run(["git", "-C", location, *args], capture_output=True, text=True)
+        if result.returncode != 0:
+            raise UpdateCheckError(result.stderr.strip() or f"git {args[0]} failed")
+        return result.stdout
+
+    def probe(self, location: str, ref: str) -> str:
+        return self._git(location, "rev-parse", "--verify", f"{ref}^{{commit}}").strip()
+
+    def fetch(self, location: str, ref: str, validator: str) -> Dict:
+        try:
+            return json.loads(self._git(location, "show", f"{validator}:.claude-plugin/marketplace.json"))
+        except ValueError as e:
+            raise UpdateCheckError(f"invalid marketplace.json: {e}")
+
+    def resolve(self, location: str, ref: str, version: str) -> str:
+        if version == "latest":
+            return self.probe(location, ref)
+        for tag in (f"v{version}", version):
+            try:
+                return self.probe(location, f"refs/tags/{tag}")
+            except UpdateCheckError:
+                continue
+        raise UpdateCheckError(f"version {version} not found (no tag v{version} or {version})")
+
+    def export(self, location: str, validator: str, path: str, tmp_dir: Path) -> Path:
+        path = path.strip("/")
+        result = subprocess.run(
+            ["git", "-C", location, "archive", "--format=tar", validator, "--", path],
+            capture_output=True
+        )
+        if result.returncode != 0:
+            raise UpdateCheckError(result.stderr.decode(errors="replace").strip() or "git archive failed")
+
+        dest = tmp_dir / "export"
+        with tarfile.open(fileobj=io.BytesIO(result.stdout)) as tar:
+            for member in tar.getmembers():
+                if not member.isfile():
+                    continue  # Directories are implied; symlinks are not installed
+                target = dest / PurePosixPath(member.name).relative_to(path)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                with tar.extractfile(member) as src, open(target, "wb") as out:
+                    shutil.copyfileobj(src, out)
+                if member.mode & 0o111:
+                    target.chmod(0o755)
+        return dest
+
+    def snapshot(self, location: str, validator: str, path: str,
+                 hashes: "FileHashCache") -> Tuple[str, Dict[str, str], Callable[[str], bytes]]:
+        # Blob ids come straight from the tree object; nothing is checked out
+        path = path.strip("/")
+        files = {}
+        for record in self._git(location, "ls-tree", "-r", "-z", validator, "--", f"{path}/").split("\0"):
+            if not record:
+                continue
+            meta, name = record.split("\t", 1)
+            _, kind, blob = meta.split()
+            if kind == "blob":
+                files[PurePosixPath(name).relative_to(path).as_posix()] = blob
+
+        def read(rel: str) -> bytes:
+            result = subprocess.run(["git", "-C", location, "cat-file", "blob", files[rel]],
+                                    capture_output=True)
+            return result.stdout
+
+        return "git-blob", files, read
+
+
+class FileRegistrySource(UpdateSource):
+    """
+    Marketplace manifest served from a ``file://`` URL
+
+    The URL names either the manifest itself or a directory containing
+    ``.claude-plugin/marketplace.json``; the validator is an ETag built from
+    the file's mtime and size.
+    """
+
+    name = "file"
+    versioned = False
+
+    def locate(self, plugin: Dict) -> Optional[str]:
+        url = plugin.get("source", {}).get("url", "")
+        if not url.startswith("file://"):
+            return None
+
+        path = Path(unquote(urlparse(url).path))
+        if path.is_dir():
+            path = path / ".claude-plugin" / "marketplace.json"
+        return str(path)
+
+    def probe(self, location: str, ref: str) -> str:
+        try:
+            st = Path(location).stat()
+        except OSError as e:
+            raise UpdateCheckError(str(e))
+        return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+    def fetch(self, location: str, ref: str, validator: str) -> Dict:
+        try:
+            with open(location, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise UpdateCheckError(str(e))
+
+    def resolve(self, location: str, ref: str, version: str) -> str:
+        return self.probe(location, ref)
+
+    def export(self, location: str, validator: str, path: str, tmp_dir: Path) -> Path:
+        # <root>/.claude-plugin/marketplace.json → <root>/<path>
+        directory = Path(location).parent.parent / path.strip("/")
+        if not directory.is_dir():
+            raise UpdateCheckError(f"plugin directory not found: {directory}")
+        return directory
+
+    def snapshot(self, location: str, validator: str, path: str,
+                 hashes: "FileHashCache") -> Tuple[str, Dict[str, str], Callable[[str], bytes]]:
+        directory = self.export(location, validator, path, Path())
+        return "sha256", hashes.hash_directory(directory, "sha256"), \
+            lambda rel: (directory / rel).read_bytes()
+
+
+def _marketplace_versions(manifest: Dict) -> Dict[str, str]:
+    """Plugin name and source path → version from a marketplace manifest"""
+    default = manifest.get("metadata", {}).get("version")
+    versions = {}
+    for entry in manifest.get("plugins", []):
+        version = entry.get("version", default)
+        if not version:
+            continue
+        if entry.get("name"):
+            versions[entry["name"]] = version
+        if isinstance(entry.get("source"), str):
+            versions[re.sub(r"^\./", "", entry["source"]).rstrip("/")] = version
+    return versions
+
+
+def _version_key(version: str) -> Tuple[int, ...]:
+    return tuple(int(n) for n in re.findall(r"\d+", version))
+
+
+class ObjectStore:
+    """
+    Content-addressed file store shared by plugin versions and projects
+
+    Files are stored once under ``objects/`` by SHA-256 (read-only, ``.x``
+    suffix for executables); a plugin version is a tree manifest under
+    ``trees/`` mapping relative paths to objects. Installing a tree reflinks
+    (copy-on-write clones) or, where unsupported, copies the objects; plugin
+    directories are editable, so they never share inodes with the store.
+    """
+
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    @classmethod
+    def default_root(cls) -> Path:
+        """Machine-wide store (override with CLAUDE_PLUGIN_STORE)"""
+        return Path(os.environ.get("CLAUDE_PLUGIN_STORE") or Path.home() / ".cache" / "claude-plugins")
+
+    def _object_path(self, digest: str, executable: bool) -> Path:
+        return self.root / "objects" / digest[:2] / (digest[2:] + (".x" if executable else ""))
+
+    def _tree_path(self, tree_hash: str) -> Path:
+        return self.root / "trees" / tree_hash[:2] / f"{tree_hash[2:]}.json"
+
+    def _write_atomic(self, target: Path, fill):
+        """Create target via a temp file in the same directory (safe for concurrent writers)"""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                fill(out)
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def _sha256(self, path: Path) -> str:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def add_file(self, path: Path) -> Tuple[str, bool]:
+        """Store a file (no-op if the content is already stored intact)"""
+        digest = self._sha256(path)
+        executable = bool(os.stat(path).st_mode & 0o111)
+
+        obj = self._object_path(digest, executable)
+        # Replace objects modified in place (e.g. through a hardlink made by older versions)
+        if not obj.exists() or self._sha256(obj) != digest:
+            def fill(out):
+                with open(path, "rb") as f:
+                    shutil.copyfileobj(f, out, self.CHUNK_SIZE)
+                os.chmod(out.fileno(), 0o555 if executable else 0o444)
+            self._write_atomic(obj, fill)
+        return digest, executable
+
+    def add_tree(self, directory: Path) -> str:
+        """Store every regular file under directory; return the tree hash"""
+        entries = {}
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames.sort()
+            for name in sorted(filenames):
+                path = Path(dirpath) / name
+                if path.is_symlink() or not path.is_file():
+                    continue
+                digest, executable = self.add_file(path)
+                entries[path.relative_to(directory).as_posix()] = {"hash": digest, "x": executable}
+
+        data = json.dumps(entries, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        tree_hash = hashlib.sha256(data).hexdigest()
+        tree = self._tree_path(tree_hash)
+        if not tree.exists():
+            self._write_atomic(tree, lambda out: out.write(data))
+        return tree_hash
+
+    def has_tree(self, tree_hash: Optional[str]) -> bool:
+        return bool(tree_hash) and self._tree_path(tree_hash).exists()
+
+    def read_tree(self, tree_hash: str) -> Dict[str, Dict]:
+        with open(self._tree_path(tree_hash), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def read_object(self, entry: Dict) -> bytes:
+        """Content of a tree entry's object"""
+        return self._object_path(entry["hash"], entry["x"]).read_bytes()
+
+    def _place(self, obj: Path, target: Path) -> str:
+        """Reflink, else copy an object to target"""
+        with open(obj, "rb") as src, open(target, "wb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), 0x40049409, src.fileno())  # FICLONE
+                method = "reflinked"
+            except (AttributeError, OSError):
+                shutil.copyfileobj(src, dst, self.CHUNK_SIZE)
+                method = "copied"
+        target.chmod(0o755 if obj.name.endswith(".x") else 0o644)
+        return method
+
+    def materialize(self, tree_hash: str, dest: Path) -> Dict[str, int]:
+        """
+        Replace dest with the files of a stored tree
+
+        The tree is assembled next to dest and swapped in with renames, so
+        dest is never left half-written.
+
+        Returns:
+            Count of files per placement method (reflinked/copied)
+
+        Raises:
+            CorruptObjectError: If a stored object no longer matches its hash
+                (dest is left untouched; re-adding the file repairs it)
+        """
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=dest.parent, prefix=f".{dest.name}.new-"))
+        stats = {"reflinked": 0, "copied": 0}
+
+        try:
+            for rel, entry in self.read_tree(tree_hash).items():
+                obj = self._object_path(entry["hash"], entry["x"])
+                if self._sha256(obj) != entry["hash"]:
+                    raise CorruptObjectError(f"stored object for {rel} is corrupt: {obj}")
+                target = staging / rel
+                target.parent.mkdir(parents=True, exist_ok=True)
+                stats[self._place(obj, target)] += 1
+
+            if dest.exists():
+                retired = Path(tempfile.mkdtemp(dir=dest.parent, prefix=f".{dest.name}.old-"))
+                os.replace(dest, retired / dest.name)
+                os.replace(staging, dest)
+                shutil.rmtree(retired, ignore_errors=True)
+            else:
+                os.replace(staging, dest)
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+        return stats
+
+
+class FileHashCache:
+    """
+    File content hashes cached by (mtime, size)
+
+    Persisted as JSON so repeated diffs only hash files that changed.
+    """
+
+    def __init__(self, cache_path: Path):
+        self.cache_path = cache_path
+        self._entries: Optional[Dict[str, List]] = None
+        self._dirty = False
+
+    def _load(self) -> Dict[str, List]:
+        if self._entries is None:
+            try:
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def hash_file(self, path: Path, algorithm: str) -> str:
+        """sha256 of the content, or the git blob id for ``algorithm="git-blob"``"""
+        st = path.stat()
+        key = f"{algorithm}:{path.resolve()}"
+        entries = self._load()
+        cached = entries.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+
+        if algorithm == "git-blob":
+            digest = hashlib.sha1(f"blob {st.st_size}\0".encode())
+        else:
+            digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(ObjectStore.CHUNK_SIZE), b""):
+                digest.update(chunk)
+
+        entries[key] = [st.st_mtime_ns, st.st_size, digest.hexdigest()]
+        self._dirty = True
+        return entries[key][2]
+
+    def hash_directory(self, directory: Path, algorithm: str) -> Dict[str, str]:
+        """Relative posix path → hash for every regular file under directory"""
+        files = {}
+        for dirpath, dirnames, filenames in os.walk(directory):
+            for name in filenames:
+                path = Path(dirpath) / name
+                if path.is_symlink() or not path.is_file():
+                    continue
+                files[path.relative_to(directory).as_posix()] = self.hash_file(path, algorithm)
+        return files
+
+    def save(self):
+        if not self._dirty:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_path.parent, prefix=".hashes-")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.cache_path)
+        self._dirty = False
+
+
+def merkle_tree(files: Dict[str, str]) -> Dict:
+    """
+    Build a Merkle tree from relative path → file hash
+
+    Each node is ``{"hash", "files": {name: hash}, "dirs": {name: node}}``;
+    a directory hash covers the names and hashes of all its children.
+    """
+    root = {"files": {}, "dirs": {}}
+    for rel, file_hash in files.items():
+        *parents, name = rel.split("/")
+        node = root
+        for part in parents:
+            node = node["dirs"].setdefault(part, {"files": {}, "dirs": {}})
+        node["files"][name] = file_hash
+
+    def seal(node: Dict) -> Dict:
+        digest = hashlib.sha256()
+        for name, child in sorted(node["dirs"].items()):
+            digest.update(f"d {name} {seal(child)['hash']}\n".encode())
+        for name, file_hash in sorted(node["files"].items()):
+            digest.update(f"f {name} {file_hash}\n".encode())
+        node["hash"] = digest.hexdigest()
+        return node
+
+    return seal(root)
+
+
+def diff_merkle(local: Dict, upstream: Dict, prefix: str = "") -> List[Tuple[str, str]]:
+    """
+    Files that differ between two Merkle trees
+
+    Subtrees with equal hashes are skipped without being visited.
+
+    Returns:
+        Sorted (status, path) pairs; status is "M" (modified), "A" (local
+        only) or "D" (upstream only)
+    """
+    if local["hash"] == upstream["hash"]:
+        return []
+
+    changes = []
+    for name in set(local["files"]) | set(upstream["files"]):
+        ours, theirs = local["files"].get(name), upstream["files"].get(name)
+        if ours != theirs:
+            changes.append(("A" if theirs is None else "D" if ours is None else "M", prefix + name))
+
+    empty = merkle_tree({})
+    for name in set(local["dirs"]) | set(upstream["dirs"]):
+        changes.extend(diff_merkle(local["dirs"].get(name, empty),
+                                   upstream["dirs"].get(name, empty),
+                                   f"{prefix}{name}/"))
+    return sorted(changes, key=lambda change: change[1])
+
+
+def load_lock_file(lock_path: Path) -> List[Dict]:
+    """
+    Read a plugin lock file
+
+    The lock file is JSON: ``{"plugins": [{"id": ..., "version": ...,
+    "source": <url or registry source dict>, "path": ..., "dependencies":
+    [...]}]}``. Only ``id`` is required; version defaults to "latest".
+
+    Raises:
+        ValueError: If the file is not a valid lock file
+    """
+    with open(lock_path, "r", encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{lock_path}: {e}") from e
+
+    entries = data.get("plugins") if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ValueError(f"{lock_path}: expected a \"plugins\" list")
+
+    plugins = []
+    seen = set()
+    for entry in entries:
+        if not isinstance(entry, dict) or not entry.get("id"):
+            raise ValueError(f"{lock_path}: plugin entry without an id: {entry!r}")
+        if entry["id"] in seen:
+            raise ValueError(f"{lock_path}: duplicate plugin {entry['id']}")
+        seen.add(entry["id"])
+
+        source = entry.get("source") or {}
+        if isinstance(source, str):
+            source = {"url": source}
+        plugins.append({
+            "id": entry["id"],
+            "version": entry.get("version") or "latest",
+            "url": source.get("url"),
+            "commit": source.get("commit") or "main",
+            "path": entry.get("path") or source.get("path"),
+            "dependencies": list(entry.get("dependencies") or []),
+        })
+    return plugins
+
+
+def dependency_order(graph: Dict[str, List[str]]) -> List[str]:
+    """
+    Topologically sort plugin ids so dependencies come first (Kahn's algorithm)
+
+    Dependencies that are not keys of graph are ignored. Ties keep the
+    order of graph.
+
+    Raises:
+        ValueError: If the dependencies form a cycle
+    """
+    position = {node: i for i, node in enumerate(graph)}
+    pending = {node: {dep for dep in deps if dep in graph} for node, deps in graph.items()}
+    dependents: Dict[str, List[str]] = {node: [] for node in graph}
+    for node, deps in pending.items():
+        for dep in deps:
+            dependents[dep].append(node)
+
+    ready = [node for node in graph if not pending[node]]
+    order = []
+    while ready:
+        node = ready.pop(0)
+        order.append(node)
+        for dependent in dependents[node]:
+            pending[dependent].discard(node)
+            if not pending[dependent]:
+                ready.append(dependent)
+        ready.sort(key=position.get)
+
+    if len(order) < len(graph):
+        cycle = sorted((node for node in graph if pending[node]), key=position.get)
+        raise ValueError(f"dependency cycle between {', '.join(cycle)}")
+    return order
+
 
 class PluginManager:
     """Plugin manager for Claude Code plugins"""
 
-    def __init__(self, registry_path: str = ".claude-plugin/registry.json"):
+    def __init__(self, registry_path: str = ".claude-plugin/registry.json",
+                 cache_dir: Optional[str] = None, store_dir: Optional[str] = None):
         self.registry_path = Path(registry_path)
-        self.registry = self._load_registry()
+        self.cache_dir = Path(cache_dir) if cache_dir else self.registry_path.parent / ".cache"
+        self.store = ObjectStore(Path(store_dir) if store_dir else ObjectStore.default_root())
+        self.hashes = FileHashCache(self.cache_dir / "file-hashes.json")
+        self.index = RegistryIndex(self.registry_path, self.cache_dir / "registry-index.sqlite")
+        self._registry: Optional[Dict] = None
+        self._plugins_by_id: Optional[Dict[str, Dict]] = None
+        self._hashes_lock = threading.Lock()  # FileHashCache is not thread-safe
+
+    @property
+    def registry(self) -> Dict:
+        """Full registry, loaded on first access"""
+        if self._registry is None:
+            self._registry = self._load_registry()
+            self._plugins_by_id = None
+        return self._registry
+
+    def _find_plugin(self, plugin_id: str, live: bool = False) -> Optional[Dict]:
+        """
+        Look up a plugin by id
+
+        Once the full registry is loaded (or with ``live``) this returns the
+        live entry, so it can be modified and saved; otherwise only that
+        entry is decoded through the on-disk index.
+        """
+        if self._registry is None and not live:
+            try:
+                return self.index.get(plugin_id)
+            except (OSError, ValueError, sqlite3.Error):
+                pass  # Unreadable cache or registry: fall back to a full load
+
+        plugins = self.registry.get("plugins", [])
+        if self._plugins_by_id is None:
+            self._plugins_by_id = {}
+            for plugin in plugins:
+                self._plugins_by_id.setdefault(plugin["id"], plugin)
+        return self._plugins_by_id.get(plugin_id)
 
     def _load_registry(self) -> Dict:
         """Load plugin registry"""
@@ -37,11 +813,22 @@ class PluginManager:
             return json.load(f)
 
     def _save_registry(self):
-        """Save plugin registry"""
-        with open(self.registry_path, 'w') as f:
-            json.dump(self.registry, f, indent=2)
+        """Save plugin registry (write to a temp file, then rename over the original)"""
+        self.registry_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.registry_path.parent, prefix=".registry-",
+                                        suffix=".json")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.registry, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.registry_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
 
-    def list_plugins(self, verbose: bool = False):
+    def list_plugins(self, verbose: bool = False, sources: Optional[List[UpdateSource]] = None):
         """List all installed plugins"""
         print("\n📦 Installed Plugins:\n")
 
@@ -59,108 +846,766 @@ class PluginManager:
             if verbose:
                 print(f"   Path: {plugin['localPath']}")
                 if plugin.get("upstream"):
-                    print(f"   Upstream: {plugin['upstream']['repository']}")
-                    print(f"   License: {plugin['upstream']['license']}")
-                    print(f"   Author: {plugin['upstream']['author']['name']}")
+                    upstream = plugin["upstream"]
+                    print(f"   Upstream: {upstream['repository']}")
+                    if upstream.get("license"):
+                        print(f"   License: {upstream['license']}")
+                    if upstream.get("author"):
+                        print(f"   Author: {upstream['author']['name']}")
                 if plugin.get("localChanges"):
                     print(f"   Local changes: {len(plugin['localChanges'])}")
+                if plugin.get("source", {}).get("type") == "upstream":
+                    print(f"   Diff: {self._diff_summary(plugin, sources)}")
                 print()
 
+        self.hashes.save()
         print(f"\nTotal: {len(plugins)} plugins")
 
-    def check_updates(self):
-        """Check for available updates from upstream"""
-        print("\n🔍 Checking for updates...\n")
+    def _diff_summary(self, plugin: Dict, sources: Optional[List[UpdateSource]]) -> str:
+        """One-line summary of local vs upstream differences"""
+        try:
+            diff = self._diff_plugin(plugin, sources)
+        except UpdateCheckError as e:
+            return f"n/a ({e})"
 
-        plugins_with_updates = []
+        changes, _, _ = diff
+        if not changes:
+            return "clean"
+        counts = {status: sum(1 for s, _ in changes if s == status) for status in "MAD"}
+        labels = {"M": "modified", "A": "local only", "D": "missing locally"}
+        return ", ".join(f"{n} {labels[status]}" for status, n in counts.items() if n)
 
-        for plugin in self.registry.get("plugins", []):
-            if plugin.get("source", {}).get("type") != "upstream":
-                continue
+    def check_updates(self, sources: Optional[List[UpdateSource]] = None, jobs: int = 8,
+                      as_json: bool = False) -> List[Dict]:
+        """
+        Check for available updates from upstream
+
+        Each distinct upstream (location + ref) is probed once, concurrently
+        on up to ``jobs`` threads. Manifests are fetched only when the probe
+        validator (commit SHA / ETag) differs from the cached one in
+        ``<cache_dir>/update-checks.json``.
+
+        Args:
+            sources: Update sources tried in order (default: file:// only)
+            jobs: Maximum concurrent upstream checks
+            as_json: Print results as JSON instead of a table
+
+        Returns:
+            One result dict per upstream plugin, in registry order
+        """
+        sources = sources if sources is not None else [FileRegistrySource()]
+        cache_path = self.cache_dir / "update-checks.json"
+        cache = self._load_json_cache(cache_path)
+
+        plugins = [p for p in self.registry.get("plugins", [])
+                   if p.get("source", {}).get("type") == "upstream"]
+
+        # Resolve each plugin to (source, location, ref); share checks per upstream
+        targets: Dict[str, Tuple[UpdateSource, str, str]] = {}
+        plugin_keys: Dict[str, Optional[str]] = {}
+        for plugin in plugins:
+            plugin_keys[plugin["id"]] = None
+            ref = plugin.get("source", {}).get("commit") or "HEAD"
+            for source in sources:
+                location = source.locate(plugin)
+                if location:
+                    key = f"{source.name}:{location}@{ref}"
+                    targets[key] = (source, location, ref)
+                    plugin_keys[plugin["id"]] = key
+                    break
+
+        def check(key: str) -> Tuple[str, Dict, bool]:
+            source, location, ref = targets[key]
+            cached = cache.get(key)
+            try:
+                validator = source.probe(location, ref)
+                if cached and cached.get("validator") == validator:
+                    return key, cached, False
+                manifest = source.fetch(location, ref, validator)
+                return key, {"validator": validator, "versions": _marketplace_versions(manifest)}, True
+            except UpdateCheckError as e:
+                return key, {"error": str(e)}, False
+
+        upstreams: Dict[str, Tuple[Dict, bool]] = {}
+        if targets:
+            with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(targets)))) as pool:
+                for key, entry, fetched in pool.map(check, sorted(targets)):
+                    upstreams[key] = (entry, fetched)
+                    if "error" not in entry:
+                        cache[key] = entry
 
-            plugin_id = plugin["id"]
-            current_version = plugin["version"]
-            upstream_repo = plugin["upstream"]["repository"]
+        results = []
+        for plugin in plugins:
+            key = plugin_keys[plugin["id"]]
+            result = {
+                "id": plugin["id"],
+                "current": plugin["version"],
+                "latest": None,
+                "status": "no-source",
+                "upstream": targets[key][1] if key else None,
+                "fetched": False,
+            }
+            if key:
+                entry, fetched = upstreams[key]
+                result["fetched"] = fetched
+                if "error" in entry:
+                    result["status"] = "error"
+                    result["error"] = entry["error"]
+                else:
+                    path = plugin.get("source", {}).get("path", "").strip("/")
+                    latest = entry["versions"].get(plugin["id"]) or entry["versions"].get(path)
+                    result["latest"] = latest
+                    if latest is None:
+                        result["status"] = "unknown"
+                    elif _version_key(latest) > _version_key(plugin["version"]):
+                        result["status"] = "update-available"
+                    else:
+                        result["status"] = "up-to-date"
+            results.append(result)
+
+        if targets:
+            self._save_json_cache(cache_path, cache)
+
+        if as_json:
+            print(json.dumps(results, indent=2))
+        else:
+            self._print_update_table(results)
+        return results
+
+    def _print_update_table(self, results: List[Dict]):
+        """Print update check results as a table"""
+        print("\n🔍 Checking for updates...\n")
 
-            print(f"Checking {plugin_id}@{current_version}...")
+        labels = {
+            "update-available": "⬆️  update available",
+            "up-to-date": "✅ up to date",
+            "unknown": "⚠️  not in upstream manifest",
+            "no-source": "⚠️  no update source",
+            "error": "❌ error",
+        }
+        rows = [("Plugin", "Current", "Latest", "Status")]
+        for r in results:
+            status = labels[r["status"]]
+            if r["status"] == "error":
+                status = f"{status}: {r['error']}"
+            rows.append((r["id"], r["current"], r["latest"] or "-", status))
 
-            # Simulate version check (in real implementation, fetch from GitHub API)
-            # For now, just report current version
-            print(f"  Current: {current_version}")
-            print(f"  Status: Up to date (check skipped - implement GitHub API)")
+        widths = [max(len(row[i]) for row in rows) for i in range(3)]
+        for row in rows:
+            print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)) + "  " + row[3])
 
-        if plugins_with_updates:
-            print(f"\n✅ {len(plugins_with_updates)} updates available")
+        updates = sum(1 for r in results if r["status"] == "update-available")
+        unchecked = sum(1 for r in results if r["status"] not in ("update-available", "up-to-date"))
+        if updates:
+            print(f"\n✅ {updates} updates available")
+        elif unchecked:
+            print(f"\n⚠️  No updates found ({unchecked} plugins could not be checked)")
         else:
             print("\n✅ All plugins are up to date")
 
-    def diff_upstream(self, plugin_id: str):
-        """Show diff between local and upstream version"""
+    def _load_json_cache(self, path: Path) -> Dict:
+        """Load a JSON cache file (empty if missing or unreadable)"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_json_cache(self, path: Path, data: Dict):
+        """Save a JSON cache file"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+
+    def _upstream_snapshot(self, plugin: Dict, sources: Optional[List[UpdateSource]]
+                           ) -> Tuple[str, str, Dict[str, str], Callable[[str], bytes]]:
+        """
+        Upstream file hashes for a plugin
+
+        Prefers the pristine tree recorded at install time (hashes read from
+        the object store, no I/O on plugin files); otherwise asks the first
+        source that can locate the upstream, at the installed version.
+
+        Returns:
+            (label, hash algorithm, relative path → hash, content reader)
+
+        Raises:
+            UpdateCheckError: If no source can locate the upstream or the
+                upstream does not provide the installed version
+        """
+        if plugin.get("treeHash"):
+            try:
+                tree = self.store.read_tree(plugin["treeHash"])
+            except (OSError, ValueError):
+                tree = None
+            if tree is not None:
+                files = {rel: entry["hash"] for rel, entry in tree.items()}
+                read = lambda rel: self.store.read_object(tree[rel])
+                return f"installed tree {plugin['treeHash'][:12]}", "sha256", files, read
+
+        source_info = plugin.get("source", {})
+        ref = source_info.get("commit") or "HEAD"
+        path = source_info.get("path") or f"plugins/{plugin['id']}"
+
+        for source in sources if sources is not None else [FileRegistrySource()]:
+            location = source.locate(plugin)
+            if not location:
+                continue
+            try:
+                validator = source.resolve(location, ref, plugin["version"])
+            except UpdateCheckError as e:
+                raise UpdateCheckError(
+                    f"installed version {plugin['version']} not available upstream ({e})") from e
+            if not source.versioned:
+                # Unversioned sources only serve their current files
+                upstream_version = self._upstream_version(source, location, ref, validator,
+                                                          plugin["id"], path)
+                if upstream_version and upstream_version != plugin["version"]:
+                    raise UpdateCheckError(
+                        f"installed version {plugin['version']} not available upstream "
+                        f"(it provides {upstream_version})")
+            algorithm, files, read = source.snapshot(location, validator, path, self.hashes)
+            return f"{location} @ {validator[:12]} ({plugin['version']})", algorithm, files, read
+
+        raise UpdateCheckError(f"no upstream source for {source_info.get('url', plugin['id'])}")
+
+    def _diff_plugin(self, plugin: Dict, sources: Optional[List[UpdateSource]]
+                     ) -> Tuple[List[Tuple[str, str]], str, Callable[[str], bytes]]:
+        """Differing files between localPath and upstream (Merkle comparison)"""
+        local_path = Path(plugin["localPath"])
+        if not local_path.is_dir():
+            raise UpdateCheckError(f"{local_path} not found")
+
+        label, algorithm, upstream_files, read = self._upstream_snapshot(plugin, sources)
+        local_files = self.hashes.hash_directory(local_path, algorithm)
+        changes = diff_merkle(merkle_tree(local_files), merkle_tree(upstream_files))
+        return changes, label, read
+
+    def diff_upstream(self, plugin_id: str, sources: Optional[List[UpdateSource]] = None,
+                      unified: bool = False) -> Optional[List[Tuple[str, str]]]:
+        """
+        Show diff between local and upstream version
+
+        Args:
+            plugin_id: Plugin ID
+            sources: Upstream sources tried in order (default: file:// only)
+            unified: Also print unified diffs of modified files
+
+        Returns:
+            (status, path) pairs, or None if the plugin could not be compared
+        """
         print(f"\n🔍 Comparing {plugin_id} with upstream...\n")
 
         # Find plugin
-        plugin = next(
-            (p for p in self.registry.get("plugins", []) if p["id"] == plugin_id),
-            None
-        )
+        plugin = self._find_plugin(plugin_id)
 
         if not plugin:
             print(f"❌ Plugin not found: {plugin_id}")
-            return
+            return None
 
         if plugin.get("source", {}).get("type") != "upstream":
             print(f"⚠️  Plugin {plugin_id} is local-only (no upstream)")
-            return
+            return None
 
         local_path = Path(plugin["localPath"])
-        upstream_url = plugin["source"]["url"]
+        error = None
+
+        try:
+            changes, label, read = self._diff_plugin(plugin, sources)
+        except UpdateCheckError as e:
+            changes, label, read = None, plugin["source"]["url"], None
+            error = e
+        finally:
+            self.hashes.save()
 
         print(f"Local: {local_path}")
-        print(f"Upstream: {upstream_url}")
+        print(f"Upstream: {label}")
 
         if plugin.get("localChanges"):
-            print(f"\n📝 Local changes:")
+            print(f"\n📝 Recorded local changes:")
             for change in plugin["localChanges"]:
                 print(f"  - {change}")
+
+        if changes is None:
+            print(f"\n❌ Cannot compare: {error}")
+            return None
+
+        if not changes:
+            print("\n✅ No differences from upstream")
+            return changes
+
+        labels = {"M": "modified", "A": "local only", "D": "missing locally"}
+        print(f"\n📝 {len(changes)} files differ:")
+        for status, rel in changes:
+            print(f"  {status} {rel} ({labels[status]})")
+
+        if unified:
+            for status, rel in changes:
+                if status != "M":
+                    continue
+                ours = (local_path / rel).read_bytes().decode("utf-8", errors="replace")
+                theirs = read(rel).decode("utf-8", errors="replace")
+                print()
+                sys.stdout.writelines(difflib.unified_diff(
+                    theirs.splitlines(keepends=True), ours.splitlines(keepends=True),
+                    fromfile=f"upstream/{rel}", tofile=f"local/{rel}"))
+
+        return changes
+
+    @staticmethod
+    def _parse_spec(plugin_spec: str) -> Tuple[str, str]:
+        """Split "id@version" (version defaults to "latest")"""
+        parts = plugin_spec.split("@")
+        return parts[0], parts[1] if len(parts) > 1 else "latest"
+
+    @staticmethod
+    def _upstream_version(source: UpdateSource, location: str, ref: str, validator: str,
+                          plugin_id: str, path: str) -> Optional[str]:
+        """Version the upstream marketplace lists for a plugin (None if unknown)"""
+        try:
+            versions = _marketplace_versions(source.fetch(location, ref, validator))
+        except UpdateCheckError:
+            return None
+        return versions.get(plugin_id) or versions.get(path.strip("/"))
+
+    def _fetch_tree(self, plugin: Dict, version: str,
+                    sources: List[UpdateSource]) -> Tuple[str, str]:
+        """
+        Store a plugin version from its upstream
+
+        Returns:
+            (tree hash, resolved version)
+
+        Raises:
+            UpdateCheckError: If no source can provide the requested version
+        """
+        source_info = plugin.get("source", {})
+        ref = source_info.get("commit") or "HEAD"
+        path = source_info.get("path") or f"plugins/{plugin['id']}"
+
+        for source in sources:
+            location = source.locate(plugin)
+            if location:
+                break
+        else:
+            raise UpdateCheckError(f"no install source for {source_info.get('url', plugin['id'])}")
+
+        validator = source.resolve(location, ref, version)
+        upstream_version = self._upstream_version(source, location, ref, validator,
+                                                  plugin["id"], path)
+
+        if version == "latest":
+            if not upstream_version:
+                raise UpdateCheckError(f"{plugin['id']} not listed in upstream marketplace.json")
+            version = upstream_version
+        elif not source.versioned and upstream_version != version:
+            raise UpdateCheckError(f"upstream only provides {plugin['id']}@{upstream_version}")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tree_hash = self.store.add_tree(source.export(location, validator, path, Path(tmp_dir)))
+        return tree_hash, version
+
+    def _deploy(self, plugin: Dict, tree_hash: str, version: str) -> Dict[str, int]:
+        """Link a stored tree into the plugin's localPath and update its entry"""
+        stats = self.store.materialize(tree_hash, Path(plugin["localPath"]))
+        self._mark_installed(plugin, tree_hash, version)
+        return stats
+
+    @staticmethod
+    def _mark_installed(plugin: Dict, tree_hash: str, version: str):
+        plugin["version"] = version
+        plugin["treeHash"] = tree_hash
+        plugin["installed"] = date.today().isoformat()
+        plugin["status"] = "active"
+
+    def _local_edits(self, plugin: Dict) -> Optional[List[Tuple[str, str]]]:
+        """
+        Files in localPath that differ from the tree installed there
+
+        Returns:
+            (status, path) pairs as from diff_merkle ([] if unmodified or not
+            deployed), or None if there is no recorded tree to compare with
+        """
+        local_path = Path(plugin["localPath"])
+        if not local_path.exists():
+            return []
+        try:
+            tree = self.store.read_tree(plugin["treeHash"]) if plugin.get("treeHash") else None
+        except (OSError, ValueError):
+            tree = None
+        if tree is None:
+            return None
+
+        try:
+            local_files = self.hashes.hash_directory(local_path, "sha256")
+        finally:
+            self.hashes.save()
+        installed = {rel: entry["hash"] for rel, entry in tree.items()}
+        return diff_merkle(merkle_tree(local_files), merkle_tree(installed))
+
+    def _check_replaceable(self, plugin: Dict) -> bool:
+        """Print why localPath must not be replaced without --force (True if it may be)"""
+        edits = self._local_edits(plugin)
+        if edits == []:
+            return True
+
+        if edits is None:
+            print(f"❌ {plugin['localPath']} exists but has no recorded installed tree; "
+                  f"cannot tell whether it holds local changes")
         else:
-            print("\n✅ No local changes detected")
+            print(f"❌ {plugin['localPath']} has local changes:")
+            for status, rel in edits:
+                print(f"  {status} {rel}")
+        print(f"   Review with 'diff-upstream {plugin['id']}', or rerun with --force to replace them")
+        return False
+
+    def _new_plugin_entry(self, plugin_id: str, source_url: str,
+                          path: Optional[str] = None, ref: str = "main") -> Dict:
+        """Registry entry for a plugin installed from an upstream URL"""
+        entry = {
+            "id": plugin_id,
+            "version": None,
+            "source": {
+                "type": "upstream",
+                "url": source_url,
+                "commit": ref,
+                "path": path or f"plugins/{plugin_id}",
+            },
+            "localPath": f".claude/plugins/{plugin_id}",
+            "localChanges": [],
+            "autoUpdate": False,
+            "status": "active",
+        }
+        repository = _github_repository(source_url)
+        if repository:
+            entry["upstream"] = {"repository": repository}
+        return entry
+
+    def _add_plugin(self, plugin: Dict):
+        """Append a plugin to the loaded registry"""
+        self.registry.setdefault("plugins", []).append(plugin)
+        if self._plugins_by_id is not None:
+            self._plugins_by_id.setdefault(plugin["id"], plugin)
 
-    def install(self, plugin_spec: str):
+    def install(self, plugin_spec: str, source_url: Optional[str] = None,
+                path: Optional[str] = None,
+                sources: Optional[List[UpdateSource]] = None, force: bool = False) -> bool:
         """
         Install a plugin
 
+        Files are stored in the shared object store and reflinked (or
+        copied) into ``.claude/plugins/<id>``; the registry is saved atomically.
+
         Args:
             plugin_spec: Plugin ID with optional version (e.g., "python-development@1.3.0")
+            source_url: Upstream URL (file:// or GitHub) for plugins not in the registry
+            path: Plugin directory within the upstream (default: plugins/<id>)
+            sources: Install sources tried in order (default: file:// only)
+            force: Replace an existing ``.claude/plugins/<id>`` directory
+
+        Returns:
+            True if the plugin was installed
         """
-        parts = plugin_spec.split("@")
-        plugin_id = parts[0]
-        version = parts[1] if len(parts) > 1 else "latest"
+        plugin_id, version = self._parse_spec(plugin_spec)
+        sources = sources if sources is not None else [FileRegistrySource()]
 
         print(f"\n📥 Installing {plugin_id}@{version}...\n")
 
         # Check if already installed
-        existing = next(
-            (p for p in self.registry.get("plugins", []) if p["id"] == plugin_id),
-            None
-        )
+        existing = self._find_plugin(plugin_id)
 
         if existing:
             print(f"⚠️  Plugin {plugin_id} is already installed (version {existing['version']})")
             print(f"   Use 'update' command to upgrade")
-            return
+            return False
+
+        if not source_url:
+            print(f"❌ No upstream for {plugin_id}: pass --source <url>")
+            return False
+
+        plugin = self._new_plugin_entry(plugin_id, source_url, path)
+        if not force and not self._check_replaceable(plugin):
+            return False
+
+        try:
+            tree_hash, version = self._fetch_tree(plugin, version, sources)
+        except UpdateCheckError as e:
+            print(f"❌ Installation failed: {e}")
+            return False
+
+        stats = self._deploy(plugin, tree_hash, version)
+        self._add_plugin(plugin)
+        self._save_registry()
+
+        print(f"✅ Installed {plugin_id}@{version} → {plugin['localPath']}")
+        print(f"   Files: {stats['reflinked']} reflinked, {stats['copied']} copied")
+        return True
+
+    def update(self, plugin_spec: str, sources: Optional[List[UpdateSource]] = None,
+               force: bool = False) -> bool:
+        """
+        Update (or switch the version of) an installed plugin
+
+        Files in localPath that differ from the installed tree are local
+        changes; the update is refused unless ``force`` is set.
+
+        Args:
+            plugin_spec: Plugin ID with optional target version (default: latest)
+            sources: Install sources tried in order (default: file:// only)
+            force: Discard local changes in localPath
+
+        Returns:
+            True if the plugin is now at the target version (also when it
+            already was); False if it is unknown, local-only, could not be
+            fetched or has local changes
+        """
+        plugin_id, version = self._parse_spec(plugin_spec)
+        sources = sources if sources is not None else [FileRegistrySource()]
+
+        print(f"\n🔄 Updating {plugin_id} → {version}...\n")
+
+        plugin = self._find_plugin(plugin_id, live=True)
 
-        print(f"❌ Installation not yet implemented")
-        print(f"   Manual installation:")
-        print(f"   1. Clone upstream repository")
-        print(f"   2. Copy plugin to .claude/plugins/{plugin_id}")
-        print(f"   3. Update registry.json")
+        if not plugin:
+            print(f"❌ Plugin not found: {plugin_id}")
+            return False
+
+        if plugin.get("source", {}).get("type") != "upstream":
+            print(f"⚠️  Plugin {plugin_id} is local-only (no upstream)")
+            return False
+
+        try:
+            tree_hash, version = self._fetch_tree(plugin, version, sources)
+        except UpdateCheckError as e:
+            print(f"❌ Update failed: {e}")
+            return False
+
+        if tree_hash == plugin.get("treeHash") and version == plugin["version"]:
+            print(f"✅ {plugin_id}@{version} is already installed")
+            return True
+
+        if not force and not self._check_replaceable(plugin):
+            return False
+
+        previous = plugin["version"]
+        stats = self._deploy(plugin, tree_hash, version)
+        self._save_registry()
+
+        print(f"✅ Updated {plugin_id}: {previous} → {version}")
+        print(f"   Files: {stats['reflinked']} reflinked, {stats['copied']} copied")
+        return True
+
+    def _bulk_deploy(self, targets: Dict[str, Tuple[Dict, str, List[str]]],
+                     sources: List[UpdateSource], jobs: int,
+                     added: Tuple[str, ...] = (), force: bool = False) -> Dict[str, Tuple[str, str]]:
+        """
+        Fetch and link many plugins on a worker pool in dependency order
+
+        A plugin starts once every dependency in ``targets`` is deployed;
+        dependents of a failed plugin are skipped. Workers only touch the
+        object store and plugin directories; registry entries are updated
+        on this thread and the registry is saved once at the end (also when
+        the run is interrupted, for the plugins deployed so far).
+
+        Args:
+            targets: Plugin id -> (registry entry, version, dependency ids)
+            sources: Install sources tried in order
+            jobs: Maximum concurrent plugins
+            added: Ids of entries to append to the registry once deployed
+            force: Replace plugin directories even if they have local changes
+
+        Returns:
+            Plugin id -> (outcome, detail); outcome is "installed", "current",
+            "failed" or "skipped"
+
+        Raises:
+            ValueError: On a dependency cycle or a dependency that is neither
+                requested nor installed
+        """
+        graph = {pid: deps for pid, (_, _, deps) in targets.items()}
+        order = dependency_order(graph)
+        for pid in order:
+            missing = [dep for dep in graph[pid] if dep not in graph and not self._find_plugin(dep)]
+            if missing:
+                raise ValueError(f"{pid} depends on {', '.join(missing)}, which is not installed")
+
+        def deploy(pid: str) -> Tuple[str, str, Optional[Dict[str, int]]]:
+            plugin, version, _ = targets[pid]
+            tree_hash = plugin.get("treeHash")
+            # A pinned version already in the store needs no upstream round trip
+            fetched = version != plugin.get("version") or not self.store.has_tree(tree_hash)
+            if fetched:
+                tree_hash, version = self._fetch_tree(plugin, version, sources)
+            local_path = Path(plugin["localPath"])
+            if (tree_hash == plugin.get("treeHash") and version == plugin.get("version")
+                    and local_path.exists()):
+                return tree_hash, version, None
+            if not force:
+                with self._hashes_lock:
+                    edits = self._local_edits(plugin)
+                if edits is None:
+                    raise RuntimeError(f"{local_path} has no recorded installed tree "
+                                       f"(use --force to replace it)")
+                if edits:
+                    listed = ", ".join(f"{status} {rel}" for status, rel in edits[:3])
+                    more = f", +{len(edits) - 3} more" if len(edits) > 3 else ""
+                    raise RuntimeError(f"local changes in {local_path} ({listed}{more}; "
+                                       f"use --force to discard them)")
+            try:
+                return tree_hash, version, self.store.materialize(tree_hash, local_path)
+            except CorruptObjectError:
+                if fetched:
+                    raise
+                # Re-fetching re-adds (and so repairs) the damaged objects
+                tree_hash, version = self._fetch_tree(plugin, version, sources)
+                return tree_hash, version, self.store.materialize(tree_hash, local_path)
+
+        outcomes: Dict[str, Tuple[str, str]] = {}
+        waiting = {pid: {dep for dep in graph[pid] if dep in graph} for pid in order}
+        changed = False
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(order) or 1))) as pool:
+                running = {}
+
+                def submit_ready():
+                    for pid in order:
+                        if pid in waiting and not waiting[pid]:
+                            del waiting[pid]
+                            running[pool.submit(deploy, pid)] = pid
+
+                submit_ready()
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in sorted(done, key=lambda f: order.index(running[f])):
+                        pid = running.pop(future)
+                        plugin, _, deps = targets[pid]
+                        try:
+                            tree_hash, version, stats = future.result()
+                        except Exception as e:  # one bad plugin must not abort the batch
+                            outcomes[pid] = ("failed", str(e) or type(e).__name__)
+                            print(f"❌ {pid}: {outcomes[pid][1]}")
+                            blocked = [pid]
+                            while blocked:
+                                failed = blocked.pop()
+                                for other in [p for p in order if failed in waiting.get(p, ())]:
+                                    del waiting[other]
+                                    outcomes[other] = ("skipped", failed)
+                                    print(f"⚠️  {other} skipped: dependency {failed} failed")
+                                    blocked.append(other)
+                            continue
+
+                        if deps and plugin.get("dependencies") != deps:
+                            plugin["dependencies"] = deps
+                            changed = True
+                        if stats is None:
+                            outcomes[pid] = ("current", version)
+                            print(f"✅ {pid}@{version} is already installed")
+                        else:
+                            self._mark_installed(plugin, tree_hash, version)
+                            if pid in added:
+                                self._add_plugin(plugin)
+                            changed = True
+                            outcomes[pid] = ("installed", version)
+                            print(f"✅ {pid}@{version} → {plugin['localPath']} "
+                                  f"({stats['reflinked']} reflinked, {stats['copied']} copied)")
+                        for other in waiting.values():
+                            other.discard(pid)
+                    submit_ready()
+        finally:
+            # Record whatever reached disk, even if the run is interrupted
+            if changed:
+                self._save_registry()
+
+        counts = {}
+        for outcome, _ in outcomes.values():
+            counts[outcome] = counts.get(outcome, 0) + 1
+        print(f"\n📊 {counts.get('installed', 0)} installed, {counts.get('current', 0)} current, "
+              f"{counts.get('failed', 0)} failed, {counts.get('skipped', 0)} skipped")
+        return outcomes
+
+    def install_from_lock(self, lock_path: str, sources: Optional[List[UpdateSource]] = None,
+                          jobs: int = 8, force: bool = False) -> bool:
+        """
+        Install (or switch to) every plugin pinned in a lock file
+
+        Plugins missing from the registry are added; installed ones are
+        moved to the locked version. See load_lock_file for the format.
+
+        Args:
+            lock_path: Path to the lock file (e.g., plugins.lock)
+            sources: Install sources tried in order (default: file:// only)
+            jobs: Maximum concurrent plugins
+            force: Replace plugin directories even if they have local changes
+
+        Returns:
+            True if every locked plugin is installed
+        """
+        sources = sources if sources is not None else [FileRegistrySource()]
+
+        print(f"\n📥 Installing from {lock_path}...\n")
+
+        try:
+            entries = load_lock_file(Path(lock_path))
+        except (OSError, ValueError) as e:
+            print(f"❌ Cannot read lock file: {e}")
+            return False
+
+        targets: Dict[str, Tuple[Dict, str, List[str]]] = {}
+        added = []
+        for entry in entries:
+            plugin = self._find_plugin(entry["id"], live=True)
+            if plugin is None:
+                if not entry["url"]:
+                    print(f"❌ No upstream for {entry['id']}: add a \"source\" to the lock file")
+                    return False
+                plugin = self._new_plugin_entry(entry["id"], entry["url"], entry["path"],
+                                                entry["commit"])
+                added.append(entry["id"])
+            elif plugin.get("source", {}).get("type") != "upstream":
+                print(f"⚠️  Plugin {entry['id']} is local-only (no upstream), skipping")
+                continue
+            targets[entry["id"]] = (plugin, entry["version"], entry["dependencies"])
+
+        try:
+            outcomes = self._bulk_deploy(targets, sources, jobs, tuple(added), force)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return False
+        return all(outcome in ("installed", "current") for outcome, _ in outcomes.values())
+
+    def update_all(self, sources: Optional[List[UpdateSource]] = None, jobs: int = 8,
+                   force: bool = False) -> bool:
+        """
+        Update every upstream plugin in the registry to its latest version
+
+        Args:
+            sources: Install sources tried in order (default: file:// only)
+            jobs: Maximum concurrent plugins
+            force: Discard local changes in plugin directories
+
+        Returns:
+            True if no plugin failed
+        """
+        sources = sources if sources is not None else [FileRegistrySource()]
+
+        print(f"\n🔄 Updating all plugins...\n")
+
+        targets = {
+            plugin["id"]: (plugin, "latest", list(plugin.get("dependencies", [])))
+            for plugin in self.registry.get("plugins", [])
+            if plugin.get("source", {}).get("type") == "upstream"
+        }
+        try:
+            outcomes = self._bulk_deploy(targets, sources, jobs, force=force)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return False
+        return all(outcome in ("installed", "current") for outcome, _ in outcomes.values())
 
     def info(self, plugin_id: str):
         """Show detailed info about a plugin"""
-        plugin = next(
-            (p for p in self.registry.get("plugins", []) if p["id"] == plugin_id),
-            None
-        )
+        plugin = self._find_plugin(plugin_id)
 
         if not plugin:
             print(f"❌ Plugin not found: {plugin_id}")
@@ -176,12 +1621,15 @@ class PluginManager:
             upstream = plugin["upstream"]
             print(f"\nUpstream:")
             print(f"  Repository: {upstream['repository']}")
-            print(f"  License: {upstream['license']}")
-            print(f"  Author: {upstream['author']['name']}")
-            if 'email' in upstream['author']:
-                print(f"  Email: {upstream['author']['email']}")
-            if 'url' in upstream['author']:
-                print(f"  URL: {upstream['author']['url']}")
+            if upstream.get("license"):
+                print(f"  License: {upstream['license']}")
+            if upstream.get("author"):
+                author = upstream["author"]
+                print(f"  Author: {author.get('name', 'unknown')}")
+                if 'email' in author:
+                    print(f"  Email: {author['email']}")
+                if 'url' in author:
+                    print(f"  URL: {author['url']}")
 
         if plugin.get("source"):
             source = plugin["source"]
@@ -203,6 +1651,14 @@ class PluginManager:
             print(f"\nNotes: {plugin['notes']}")
 
 
+def _sources(mirror: Optional[str]) -> List[UpdateSource]:
+    """Update/install sources: git mirror (if given) first, then file:// URLs"""
+    sources: List[UpdateSource] = [FileRegistrySource()]
+    if mirror:
+        sources.insert(0, GitMirrorSource(mirror))
+    return sources
+
+
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(
@@ -214,8 +1670,13 @@ Examples:
   python scripts/plugin_manager.py list -v
   python scripts/plugin_manager.py info python-development
   python scripts/plugin_manager.py check-updates
+  python scripts/plugin_manager.py check-updates --mirror ~/mirrors --json
   python scripts/plugin_manager.py diff-upstream python-development
-  python scripts/plugin_manager.py install python-development@1.3.0
+  python scripts/plugin_manager.py diff-upstream python-development -u --mirror ~/mirrors
+  python scripts/plugin_manager.py install python-development@1.3.0 --source https://github.com/wshobson/agents --mirror ~/mirrors
+  python scripts/plugin_manager.py install -r plugins.lock -j 8 --mirror ~/mirrors
+  python scripts/plugin_manager.py update python-development@1.2.0 --mirror ~/mirrors
+  python scripts/plugin_manager.py update --all --mirror ~/mirrors
         """
     )
 
@@ -224,24 +1685,57 @@ Examples:
     # List command
     parser_list = subparsers.add_parser('list', help='List installed plugins')
     parser_list.add_argument('-v', '--verbose', action='store_true', help='Verbose output')
+    parser_list.add_argument('--mirror', metavar='DIR', help='Local git mirror root (for diffs)')
 
     # Info command
     parser_info = subparsers.add_parser('info', help='Show plugin details')
     parser_info.add_argument('plugin_id', help='Plugin ID')
 
     # Check updates command
-    subparsers.add_parser('check-updates', help='Check for available updates')
+    parser_check = subparsers.add_parser('check-updates', help='Check for available updates')
+    parser_check.add_argument('--mirror', metavar='DIR',
+                              help='Local git mirror root (owner/name[.git] bare repositories)')
+    parser_check.add_argument('-j', '--jobs', type=int, default=8, help='Concurrent upstream checks')
+    parser_check.add_argument('--json', action='store_true', help='Output results as JSON')
 
     # Diff upstream command
     parser_diff = subparsers.add_parser('diff-upstream', help='Compare with upstream')
     parser_diff.add_argument('plugin_id', help='Plugin ID')
+    parser_diff.add_argument('-u', '--unified', action='store_true', help='Show unified diffs')
+    parser_diff.add_argument('--mirror', metavar='DIR', help='Local git mirror root')
 
     # Install command
     parser_install = subparsers.add_parser('install', help='Install plugin')
-    parser_install.add_argument('plugin_spec', help='Plugin ID with optional version (e.g., name@1.0.0)')
+    parser_install.add_argument('plugin_spec', nargs='?',
+                                help='Plugin ID with optional version (e.g., name@1.0.0)')
+    parser_install.add_argument('-r', '--requirements', metavar='LOCK',
+                                help='Install every plugin in a lock file (e.g., plugins.lock)')
+    parser_install.add_argument('-j', '--jobs', type=int, default=8,
+                                help='Concurrent plugins with -r')
+    parser_install.add_argument('--source', metavar='URL', help='Upstream URL (file:// or GitHub)')
+    parser_install.add_argument('--path', help='Plugin directory in the upstream (default: plugins/<id>)')
+    parser_install.add_argument('--mirror', metavar='DIR', help='Local git mirror root')
+    parser_install.add_argument('--force', action='store_true',
+                                help='Replace an existing plugin directory, discarding its contents')
+
+    # Update command
+    parser_update = subparsers.add_parser('update', help='Update or switch plugin version')
+    parser_update.add_argument('plugin_spec', nargs='?',
+                               help='Plugin ID with optional version (e.g., name@1.1.0)')
+    parser_update.add_argument('--all', action='store_true', help='Update every upstream plugin')
+    parser_update.add_argument('-j', '--jobs', type=int, default=8,
+                               help='Concurrent plugins with --all')
+    parser_update.add_argument('--mirror', metavar='DIR', help='Local git mirror root')
+    parser_update.add_argument('--force', action='store_true',
+                               help='Discard local changes in the plugin directory')
 
     args = parser.parse_args()
 
+    if args.command == 'install' and bool(args.plugin_spec) == bool(args.requirements):
+        parser_install.error("pass either plugin_spec or -r LOCK")
+    if args.command == 'update' and bool(args.plugin_spec) == args.all:
+        parser_update.error("pass either plugin_spec or --all")
+
     if not args.command:
         parser.print_help()
         sys.exit(1)
@@ -249,15 +1743,28 @@ Examples:
     manager = PluginManager()
 
     if args.command == 'list':
-        manager.list_plugins(verbose=args.verbose)
+        manager.list_plugins(verbose=args.verbose, sources=_sources(args.mirror))
     elif args.command == 'info':
         manager.info(args.plugin_id)
     elif args.command == 'check-updates':
-        manager.check_updates()
+        manager.check_updates(_sources(args.mirror), jobs=args.jobs, as_json=args.json)
     elif args.command == 'diff-upstream':
-        manager.diff_upstream(args.plugin_id)
+        manager.diff_upstream(args.plugin_id, _sources(args.mirror), unified=args.unified)
     elif args.command == 'install':
-        manager.install(args.plugin_spec)
+        if args.requirements:
+            ok = manager.install_from_lock(args.requirements, _sources(args.mirror), jobs=args.jobs,
+                                           force=args.force)
+        else:
+            ok = manager.install(args.plugin_spec, args.source, args.path, _sources(args.mirror),
+                                 force=args.force)
+        if not ok:
+            sys.exit(1)
+    elif args.command == 'update':
+        if args.all:
+            if not manager.update_all(_sources(args.mirror), jobs=args.jobs, force=args.force):
+                sys.exit(1)
+        elif not manager.update(args.plugin_spec, _sources(args.mirror), force=args.force):
+            sys.exit(1)
 
 
 if __name__ == "__main__":
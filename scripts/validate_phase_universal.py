@@ -8,18 +8,35 @@ Validates all phases (0, 0.5, 1, 2, 3, 5, 6)
 Usage:
     python scripts/validate_phase_universal.py 0 NNNN
     python scripts/validate_phase_universal.py 1
+    python scripts/validate_phase_universal.py 1 --since origin/main
     python scripts/validate_phase_universal.py 2 --coverage 80
+    python scripts/validate_phase_universal.py 2 --shards 4 --coverage-map
+    python scripts/validate_phase_universal.py 2 --since HEAD --coverage-map
+    python scripts/validate_phase_universal.py all NNNN
+    python scripts/validate_phase_universal.py 0,0.5,1 NNNN --jobs 3
+    python scripts/validate_phase_universal.py all NNNN --index-cache
+
+Cache options (--index-cache, --pairing-cache, --coverage-map) default to
+files under .git/phase-validator/, outside the working tree.
 
 Version: 1.0.0
 Compatible with: claude-code-config >= 5.0.0
 """
 
+import os
 import sys
+import io
+import json
+import fnmatch
 import argparse
 import pathlib
 import re
 import subprocess
-from typing import Optional, List, Tuple
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Tuple, Dict, Set, TextIO
 from enum import Enum
 
 
@@ -30,32 +47,367 @@ class ValidationResult(Enum):
     WARN = "⚠️  WARN"
 
 
+class FileIndex:
+    """
+    Lazily built filesystem index shared by validators
+
+    Directories are read with ``os.scandir`` the first time a query needs
+    them: existence checks and ``dir/pattern`` globs touch one directory,
+    ``dir/**/pattern`` walks that subtree (skipping IGNORED_DIRS and, like
+    pathlib, not descending into symlinked directories). Results are kept in
+    memory for the rest of the run. With ``cache_path`` the entries are
+    persisted by ``save()`` and, on the next run, only directories whose
+    mtime changed are rescanned.
+    """
+
+    IGNORED_DIRS = {".git", "node_modules", "venv", ".venv", "__pycache__",
+                    ".pytest_cache", ".mypy_cache", ".tox"}
+    GLOB_CHARS = set("*?[")
+    CACHE_VERSION = 2
+
+    def __init__(self, root: str = ".", cache_path: Optional[str] = None):
+        self.root = pathlib.Path(root)
+        self.cache_path = pathlib.Path(cache_path) if cache_path else None
+        self._dirs: Dict[str, Optional[Dict]] = {}  # directories read this run (None: missing)
+        self._cached: Optional[Dict[str, Dict]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.rescanned = 0  # directories read with scandir by this index
+
+    def _load_cache(self) -> Dict[str, Dict]:
+        """Load persisted directory entries (empty if missing or stale format)"""
+        if not self.cache_path or not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if (data.get("version") != self.CACHE_VERSION
+                or data.get("root") != os.path.abspath(self.root)):
+            return {}
+        return data.get("dirs", {})
+
+    def save(self):
+        """Persist directory entries (no-op without cache_path or when nothing was rescanned)"""
+        with self._lock:
+            if not self.cache_path or not self._dirty:
+                return
+            dirs = dict(self._cached or {})
+            dirs.update((rel, entry) for rel, entry in self._dirs.items() if entry is not None)
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(self.cache_path.suffix + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": self.CACHE_VERSION,
+                           "root": os.path.abspath(self.root),
+                           "dirs": dirs}, f)
+            os.replace(tmp_path, self.cache_path)
+            self._dirty = False
+
+    def _dir(self, rel: str) -> Optional[Dict]:
+        """Entry for one directory, reading it on first use (None if it is not a directory)"""
+        with self._lock:
+            if rel in self._dirs:
+                return self._dirs[rel]
+
+            full = os.path.join(self.root, rel)
+            try:
+                mtime = os.stat(full).st_mtime_ns
+            except OSError:
+                self._dirs[rel] = None
+                return None
+
+            if self._cached is None:
+                self._cached = self._load_cache()
+            entry = self._cached.get(rel)
+            if entry is None or entry.get("mtime") != mtime:
+                files, subdirs, links = [], [], []
+                try:
+                    with os.scandir(full) as it:
+                        for item in it:
+                            if item.is_dir():
+                                subdirs.append(item.name)
+                                if item.is_symlink():
+                                    links.append(item.name)
+                            elif not item.is_symlink() or os.path.exists(item.path):
+                                files.append(item.name)
+                except OSError:
+                    self._dirs[rel] = None
+                    return None
+                entry = {"mtime": mtime, "files": sorted(files), "dirs": sorted(subdirs),
+                         "links": sorted(links)}
+                self.rescanned += 1
+                self._dirty = True
+
+            self._dirs[rel] = entry
+            return entry
+
+    @staticmethod
+    def _normalize(path) -> str:
+        rel = pathlib.PurePath(path).as_posix()
+        return "" if rel == "." else rel
+
+    def _is_indexed(self, rel: str) -> bool:
+        """Whether rel lies inside the indexed tree (not absolute, not ignored)"""
+        parts = pathlib.PurePosixPath(rel).parts
+        return not (pathlib.PurePath(rel).is_absolute() or ".." in parts
+                    or self.IGNORED_DIRS.intersection(parts))
+
+    def glob(self, pattern: str) -> List[pathlib.Path]:
+        """
+        Return sorted paths matching pattern (relative to root)
+
+        Supports ``dir/name-pattern`` and ``dir/**/name-pattern``; anything
+        else falls back to ``pathlib.Path.glob``.
+        """
+        parts = pattern.split("/")
+        name_pattern = parts[-1]
+        dir_parts = parts[:-1]
+        recursive = "**" in dir_parts
+
+        if recursive:
+            if dir_parts.index("**") != len(dir_parts) - 1:
+                return sorted(self.root.glob(pattern))
+            dir_parts = dir_parts[:-1]
+        base = "/".join(dir_parts)
+        if any(self.GLOB_CHARS.intersection(p) for p in dir_parts) or not self._is_indexed(base):
+            return sorted(self.root.glob(pattern))
+
+        matches = []
+        stack = [base]
+        while stack:
+            rel = stack.pop()
+            entry = self._dir(rel)
+            if entry is None:
+                continue
+            for name in entry["files"]:
+                if fnmatch.fnmatchcase(name, name_pattern):
+                    matches.append(self.root / rel / name)
+            if recursive:
+                stack.extend(f"{rel}/{d}" if rel else d for d in entry["dirs"]
+                             if d not in self.IGNORED_DIRS and d not in entry["links"])
+        return sorted(matches)
+
+    def exists(self, path: pathlib.Path) -> bool:
+        """Check whether path exists (file or directory)"""
+        rel = self._normalize(path)
+        if not self._is_indexed(rel):
+            return (self.root / rel).exists()
+        if not rel:
+            return self._dir("") is not None
+
+        parent, _, name = rel.rpartition("/")
+        entry = self._dir(parent)
+        return entry is not None and (name in entry["files"] or name in entry["dirs"])
+
+
+def git_changes(since: str) -> Tuple[Set[str], Set[str]]:
+    """
+    Files changed in the working tree relative to a git ref
+
+    Paths are relative to the current directory. Renames count as the old
+    path removed and the new path changed; untracked files count as changed.
+
+    Returns:
+        (changed, removed) path sets
+
+    Raises:
+        RuntimeError: If git is unavailable or the ref is invalid
+    """
+    try:
+        diff = subprocess.run(
+            ["git", "diff", "--name-status", "-M", "-z", "--relative", since, "--"],
+            capture_output=True,
+            text=True
+        )
+        untracked = subprocess.run(
+            ["git", "ls-files", "--others", "--exclude-standard", "-z"],
+            capture_output=True,
+            text=True
+        )
+    except FileNotFoundError:
+        raise RuntimeError("git not found")
+
+    if diff.returncode != 0:
+        raise RuntimeError(f"git diff against '{since}' failed: {diff.stderr.strip()}")
+
+    changed: Set[str] = set()
+    removed: Set[str] = set()
+    tokens = diff.stdout.split("\0")
+    i = 0
+    while i < len(tokens) and tokens[i]:
+        status = tokens[i]
+        if status[0] in "RC":
+            old, new = tokens[i + 1], tokens[i + 2]
+            if status[0] == "R":
+                removed.add(old)
+            changed.add(new)
+            i += 3
+        else:
+            (removed if status[0] == "D" else changed).add(tokens[i + 1])
+            i += 2
+
+    changed.update(p for p in untracked.stdout.split("\0") if p)
+    return changed, removed
+
+
+def _git_head() -> Optional[str]:
+    """Commit SHA of HEAD (None outside a repository)"""
+    try:
+        res = subprocess.run(["git", "rev-parse", "--verify", "-q", "HEAD"],
+                             capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    return res.stdout.strip() if res.returncode == 0 else None
+
+
+def _git_is_ancestor(commit: str) -> bool:
+    """Whether commit is HEAD or one of its ancestors"""
+    try:
+        res = subprocess.run(["git", "merge-base", "--is-ancestor", commit, "HEAD"],
+                             capture_output=True, text=True)
+    except FileNotFoundError:
+        return False
+    return res.returncode == 0
+
+
+def read_coverage_reports(reports: List[pathlib.Path]) -> Optional[int]:
+    """
+    Total coverage percentage from coverage.py JSON reports
+
+    A single report uses its own total. Reports from several shards are
+    merged by taking the union of executed lines, and of executed branches
+    when measured, per file; the total counts both as coverage.py does.
+
+    Returns:
+        Rounded percentage, or None if any report is missing or malformed
+    """
+    try:
+        data = []
+        for report in reports:
+            with open(report, 'r', encoding='utf-8') as f:
+                data.append(json.load(f))
+
+        if len(data) == 1:
+            return round(data[0]["totals"]["percent_covered"])
+
+        executed: Dict[str, Set[int]] = {}
+        statements: Dict[str, Set[int]] = {}
+        # [from, to] arcs, only present when measured with --cov-branch
+        executed_arcs: Dict[str, Set[Tuple[int, int]]] = {}
+        arcs: Dict[str, Set[Tuple[int, int]]] = {}
+        for report in data:
+            for path, info in report["files"].items():
+                lines = set(info["executed_lines"])
+                executed.setdefault(path, set()).update(lines)
+                statements.setdefault(path, set()).update(lines, info["missing_lines"])
+                hit = {tuple(arc) for arc in info.get("executed_branches", [])}
+                executed_arcs.setdefault(path, set()).update(hit)
+                arcs.setdefault(path, set()).update(
+                    hit, (tuple(arc) for arc in info.get("missing_branches", [])))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    total = sum(len(items) for items in [*statements.values(), *arcs.values()])
+    if total == 0:
+        return 100
+    covered = sum(len(items) for items in [*executed.values(), *executed_arcs.values()])
+    return round(100 * covered / total)
+
+
+def build_coverage_map(data_files: List[pathlib.Path]) -> Dict[str, List[str]]:
+    """
+    Map measured source files to the test files that executed them
+
+    Reads coverage.py data files recorded with ``--cov-context=test`` (one
+    context per test id such as ``tests/test_x.py::test_a|run``) through the
+    public ``CoverageData`` API, so line and branch data both work. Files
+    measured without any test context map to an empty list.
+
+    Raises:
+        ImportError: If coverage.py is not installed
+    """
+    import coverage  # installed with pytest-cov
+
+    mapping: Dict[str, Set[str]] = {}
+    cwd = pathlib.Path.cwd().resolve()
+
+    for data_file in data_files:
+        data = coverage.CoverageData(basename=str(data_file))
+        try:
+            data.read()
+            has_contexts = any(data.measured_contexts())
+            measured = {}
+            for path in data.measured_files():
+                tests = set()
+                if has_contexts:
+                    for contexts in data.contexts_by_lineno(path).values():
+                        tests.update(c.split("::")[0] for c in contexts if c)
+                measured[path] = tests
+        except coverage.CoverageException:
+            continue
+
+        for path, tests in measured.items():
+            try:
+                rel = pathlib.Path(path).resolve().relative_to(cwd).as_posix()
+            except ValueError:
+                rel = pathlib.PurePath(path).as_posix()
+            mapping.setdefault(rel, set()).update(tests)
+
+    return {path: sorted(tests) for path, tests in sorted(mapping.items())}
+
+
+def default_cache_path(name: str) -> str:
+    """
+    Default location for a validator cache file
+
+    Caches live in the git directory (``.git/phase-validator/``) so writing
+    them never shows up in ``git status``; outside a repository they go to
+    ``.claude/.cache/``.
+    """
+    try:
+        res = subprocess.run(["git", "rev-parse", "--absolute-git-dir"],
+                             capture_output=True, text=True)
+    except FileNotFoundError:
+        res = None
+    if res is not None and res.returncode == 0:
+        return os.path.join(res.stdout.strip(), "phase-validator", name)
+    return os.path.join(".claude", ".cache", name)
+
+
 class PhaseValidator:
     """Base validator class"""
 
-    def __init__(self, verbose: bool = False):
+    def __init__(self, verbose: bool = False, index: Optional[FileIndex] = None,
+                 stream: Optional[TextIO] = None):
         self.verbose = verbose
+        self.index = index or FileIndex()
+        self.stream = stream
         self.errors: List[str] = []
         self.warnings: List[str] = []
 
+    def print(self, message: str = ""):
+        """Write a line to this validator's output stream"""
+        print(message, file=self.stream or sys.stdout)
+
     def log(self, message: str):
         """Log message if verbose"""
         if self.verbose:
-            print(f"  {message}")
+            self.print(f"  {message}")
 
     def error(self, message: str):
         """Add error"""
         self.errors.append(message)
-        print(f"❌ {message}")
+        self.print(f"❌ {message}")
 
     def warn(self, message: str):
         """Add warning"""
         self.warnings.append(message)
-        print(f"⚠️  {message}")
+        self.print(f"⚠️  {message}")
 
     def success(self, message: str):
         """Print success message"""
-        print(f"✅ {message}")
+        self.print(f"✅ {message}")
 
     def result(self) -> ValidationResult:
         """Get validation result"""
@@ -80,11 +432,11 @@ class Phase0Validator(PhaseValidator):
         Returns:
             ValidationResult
         """
-        print(f"\n🔍 Validating Phase 0 (PRD-{prd_number})...")
+        self.print(f"\n🔍 Validating Phase 0 (PRD-{prd_number})...")
 
         # 1. Check PRD file exists
         prd_pattern = f"tasks/prds/{prd_number}-prd-*.md"
-        prd_files = list(pathlib.Path(".").glob(prd_pattern))
+        prd_files = self.index.glob(prd_pattern)
 
         if not prd_files:
             self.error(f"PRD file not found: {prd_pattern}")
@@ -124,11 +476,11 @@ class Phase05Validator(PhaseValidator):
 
     def validate(self, prd_number: str) -> ValidationResult:
         """Validate Phase 0.5 completion"""
-        print(f"\n🔍 Validating Phase 0.5 (PRD-{prd_number})...")
+        self.print(f"\n🔍 Validating Phase 0.5 (PRD-{prd_number})...")
 
         # 1. Check task list exists
         task_pattern = f"tasks/{prd_number}-tasks-*.md"
-        task_files = list(pathlib.Path(".").glob(task_pattern))
+        task_files = self.index.glob(task_pattern)
 
         if not task_files:
             self.error(f"Task list not found: {task_pattern}")
@@ -175,15 +527,30 @@ class Phase05Validator(PhaseValidator):
 class Phase1Validator(PhaseValidator):
     """Phase 1: 1:1 Test Pairing validation"""
 
-    def validate(self) -> ValidationResult:
-        """Validate Phase 1: All implementation files have tests"""
-        print("\n🔍 Validating Phase 1 (1:1 Test Pairing)...")
+    SRC_SUFFIXES = (".py", ".ts", ".tsx", ".js", ".jsx")
+    CACHE_VERSION = 2
+
+    def validate(self, since: Optional[str] = None,
+                 cache_path: Optional[str] = None) -> ValidationResult:
+        """
+        Validate Phase 1: All implementation files have tests
+
+        Args:
+            since: Git ref; only check pairs touched since this ref
+            cache_path: JSON file with pairing results from earlier runs;
+                reused for files unchanged since ``since`` and since the
+                commit the cache was written at, and refreshed
+        """
+        self.print("\n🔍 Validating Phase 1 (1:1 Test Pairing)...")
+
+        if since:
+            return self._validate_incremental(since, cache_path)
 
         # Find all implementation files
-        src_patterns = ["src/**/*.py", "src/**/*.ts", "src/**/*.tsx", "src/**/*.js", "src/**/*.jsx"]
+        src_patterns = [f"src/**/*{suffix}" for suffix in self.SRC_SUFFIXES]
         src_files = []
         for pattern in src_patterns:
-            src_files.extend(pathlib.Path(".").glob(pattern))
+            src_files.extend(self.index.glob(pattern))
 
         if not src_files:
             self.warn("No implementation files found in src/")
@@ -191,26 +558,139 @@ class Phase1Validator(PhaseValidator):
 
         self.log(f"Found {len(src_files)} implementation files")
 
-        # Check each has a test file
-        orphaned = []
+        pairs = self._check_pairs(src_files)
+        if cache_path:
+            self._save_cache(cache_path, pairs)
+
+        return self._report(pairs)
+
+    def _validate_incremental(self, since: str, cache_path: Optional[str]) -> ValidationResult:
+        """Check only sources (and counterparts of tests) changed since a git ref"""
+        try:
+            changed, removed = git_changes(since)
+        except RuntimeError as e:
+            self.error(str(e))
+            return self.result()
+
+        pairs: Dict[str, bool] = {}
+        if cache_path:
+            cache = self._load_cache(cache_path)
+            cache_head = cache.get("head")
+            if cache.get("pairs") and cache_head and _git_is_ancestor(cache_head):
+                # Also re-check everything touched after the cache was written,
+                # including files that were uncommitted at the time
+                try:
+                    cache_changed, cache_removed = git_changes(cache_head)
+                except RuntimeError as e:
+                    self.error(str(e))
+                    return self.result()
+                changed |= cache_changed | set(cache.get("dirty", []))
+                removed |= cache_removed
+                pairs = cache["pairs"]
+            elif cache.get("pairs"):
+                self.log("Pairing cache was not written on an ancestor of HEAD; ignoring it")
+
+        targets = set()
+        for path in changed | removed:
+            src = path if self._is_source(path) else self._get_source_file_path(path)
+            if src:
+                targets.add(src)
+
+        for target in [t for t in targets if not self.index.exists(t)]:
+            pairs.pop(target, None)
+        targets = sorted(t for t in targets if self.index.exists(t))
+        self.log(f"{len(targets)} implementation files affected since {since}")
+
+        pairs.update(self._check_pairs([pathlib.Path(t) for t in targets]))
+        if cache_path:
+            self._save_cache(cache_path, pairs)
+
+        if not pairs:
+            self.success(f"No implementation files changed since {since}")
+            return self.result()
+
+        return self._report(pairs)
+
+    def _check_pairs(self, src_files: List[pathlib.Path]) -> Dict[str, bool]:
+        """Map each source file (posix path) to whether its test file exists"""
+        pairs = {}
         for src_file in src_files:
             test_file = self._get_test_file_path(src_file)
 
-            if test_file.exists():
+            if self.index.exists(test_file):
+                pairs[src_file.as_posix()] = True
                 self.log(f"✅ {src_file} → {test_file}")
             else:
-                orphaned.append(src_file)
+                pairs[src_file.as_posix()] = False
                 self.log(f"❌ {src_file} → MISSING: {test_file}")
+        return pairs
+
+    def _report(self, pairs: Dict[str, bool]) -> ValidationResult:
+        """Report orphaned files"""
+        orphaned = sorted(path for path, paired in pairs.items() if not paired)
 
         if orphaned:
             self.error(f"Orphaned files without tests: {len(orphaned)}")
             for file in orphaned:
-                print(f"   ❌ {file}")
+                self.print(f"   ❌ {pathlib.Path(file)}")
         else:
-            self.success(f"All {len(src_files)} files have 1:1 test pairs")
+            self.success(f"All {len(pairs)} files have 1:1 test pairs")
 
         return self.result()
 
+    def _load_cache(self, cache_path: str) -> Dict:
+        """Load the pairing cache: pairs, head commit and files dirty at that commit"""
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != self.CACHE_VERSION:
+            return {}
+        return data
+
+    def _save_cache(self, cache_path: str, pairs: Dict[str, bool]):
+        """Persist pairing results with the commit (and uncommitted files) they reflect"""
+        head = _git_head()
+        dirty: Set[str] = set()
+        if head:
+            try:
+                changed, removed = git_changes(head)
+                dirty = changed | removed
+            except RuntimeError:
+                head = None
+
+        path = pathlib.Path(cache_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.CACHE_VERSION, "head": head, "dirty": sorted(dirty),
+                       "pairs": pairs}, f, indent=2, sort_keys=True)
+
+    def _is_source(self, path: str) -> bool:
+        """Whether path is an implementation file under src/"""
+        return path.startswith("src/") and path.endswith(self.SRC_SUFFIXES)
+
+    def _get_source_file_path(self, test_path: str) -> Optional[str]:
+        """Get implementation file path for a test file (inverse of _get_test_file_path)"""
+        # tests/auth/test_oauth.py → src/auth/oauth.py
+        # tests/components/Button.test.tsx → src/components/Button.tsx
+        parts = pathlib.PurePosixPath(test_path).parts
+        if len(parts) < 2 or parts[0] != "tests":
+            return None
+
+        parent = pathlib.PurePosixPath(*parts[1:-1]) if len(parts) > 2 else pathlib.PurePosixPath()
+        name = parts[-1]
+        stem, suffix = os.path.splitext(name)
+
+        if suffix == ".py" and stem.startswith("test_"):
+            src_name = f"{stem[len('test_'):]}{suffix}"
+        elif suffix in (".ts", ".tsx", ".js", ".jsx") and stem.endswith(".test"):
+            src_name = f"{stem[:-len('.test')]}{suffix}"
+        else:
+            return None
+
+        return (pathlib.PurePosixPath("src") / parent / src_name).as_posix()
+
     def _get_test_file_path(self, src_file: pathlib.Path) -> pathlib.Path:
         """Get expected test file path for implementation file"""
         # src/auth/oauth.py → tests/auth/test_oauth.py
@@ -233,59 +713,281 @@ class Phase1Validator(PhaseValidator):
 class Phase2Validator(PhaseValidator):
     """Phase 2: Testing validation"""
 
-    def validate(self, min_coverage: int = 80) -> ValidationResult:
-        """Validate Phase 2: Tests pass with minimum coverage"""
-        print(f"\n🔍 Validating Phase 2 (Tests & Coverage)...")
+    TEST_PATTERNS = ["tests/**/test_*.py", "tests/**/*_test.py"]
+    # Changes to these (at the project root) can affect every test
+    TEST_CONFIG_FILES = {"pytest.ini", "pyproject.toml", "setup.cfg", "tox.ini", ".coveragerc"}
+    COVERAGE_MAP_VERSION = 1
+    TIMEOUT = 300
+
+    def validate(self, min_coverage: int = 80, since: Optional[str] = None,
+                 shards: int = 1, coverage_map: Optional[str] = None) -> ValidationResult:
+        """
+        Validate Phase 2: Tests pass with minimum coverage
+
+        Args:
+            min_coverage: Minimum total coverage percentage
+            since: Git ref; with ``coverage_map``, run only tests affected by
+                changes since this ref (Python projects)
+            shards: Number of pytest worker processes (Python projects)
+            coverage_map: JSON file mapping src files to the tests covering
+                them; rebuilt on every full Python run
+        """
+        self.print(f"\n🔍 Validating Phase 2 (Tests & Coverage)...")
 
         # Detect project type
-        if (pathlib.Path("package.json").exists()):
+        if self.index.exists(pathlib.Path("package.json")):
             return self._validate_node(min_coverage)
-        elif (pathlib.Path("requirements.txt").exists() or
-              pathlib.Path("pyproject.toml").exists()):
-            return self._validate_python(min_coverage)
+        elif (self.index.exists(pathlib.Path("requirements.txt")) or
+              self.index.exists(pathlib.Path("pyproject.toml"))):
+            return self._validate_python(min_coverage, since, shards, coverage_map)
         else:
             self.error("Cannot detect project type (no package.json or requirements.txt)")
             return self.result()
 
-    def _validate_python(self, min_coverage: int) -> ValidationResult:
+    def _validate_python(self, min_coverage: int, since: Optional[str] = None,
+                         shards: int = 1, coverage_map: Optional[str] = None) -> ValidationResult:
         """Validate Python tests"""
-        try:
-            # Run pytest with coverage
-            result = subprocess.run(
-                ["pytest", "tests/", "-v", "--cov=src", "--cov-report=term"],
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
+        affected = None
+        if since:
+            try:
+                affected = self._affected_tests(since, coverage_map)
+            except RuntimeError as e:
+                self.error(str(e))
+                return self.result()
 
-            if result.returncode == 0:
-                self.success("All tests passed")
-            else:
-                self.error("Tests failed")
-                print(result.stdout)
-                print(result.stderr)
+            if affected == []:
+                self.success(f"No tests affected by changes since {since}")
                 return self.result()
 
-            # Check coverage (rough parsing)
-            if f"TOTAL" in result.stdout:
-                # Extract coverage percentage
-                match = re.search(r"TOTAL\s+\d+\s+\d+\s+(\d+)%", result.stdout)
-                if match:
-                    coverage = int(match.group(1))
-                    if coverage >= min_coverage:
-                        self.success(f"Coverage: {coverage}% (>= {min_coverage}%)")
-                    else:
-                        self.error(f"Coverage too low: {coverage}% (minimum {min_coverage}%)")
+        if affected is None:
+            targets = self._shard(["tests/"] if shards <= 1 else self._test_files(), shards)
+        else:
+            self.log(f"Running {len(affected)} affected test files")
+            targets = self._shard(affected, shards)
+
+        # Test-to-source contexts are only complete for full runs
+        record_contexts = bool(coverage_map) and affected is None
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            try:
+                runs = self._run_pytest(targets, pathlib.Path(tmp_dir), record_contexts)
+            except FileNotFoundError:
+                self.error("pytest not found. Install: pip install pytest pytest-cov")
+                return self.result()
+            except subprocess.TimeoutExpired:
+                self.error("Tests timed out after 5 minutes")
+                return self.result()
+
+            failed = [run for run in runs if run.returncode != 0]
+            if failed:
+                self.error("Tests failed" if len(runs) == 1
+                           else f"Tests failed in {len(failed)}/{len(runs)} shards")
+                for run in failed:
+                    self.print(run.stdout)
+                    self.print(run.stderr)
+                return self.result()
+
+            self.success("All tests passed" if len(runs) == 1
+                         else f"All tests passed ({len(runs)} shards)")
+
+            if record_contexts:
+                data_files = [pathlib.Path(tmp_dir) / f".coverage.{i}" for i in range(len(runs))]
+                try:
+                    mapping = build_coverage_map([f for f in data_files if f.exists()])
+                except ImportError:
+                    self.print("ℹ️  Coverage map not updated (coverage.py not importable here)")
                 else:
-                    self.warn("Could not parse coverage percentage")
+                    self._save_coverage_map(coverage_map, mapping)
+                    self.log(f"Coverage map updated: {len(mapping)} source files")
 
-        except FileNotFoundError:
-            self.error("pytest not found. Install: pip install pytest pytest-cov")
-        except subprocess.TimeoutExpired:
-            self.error("Tests timed out after 5 minutes")
+            if affected is not None:
+                self.print(f"ℹ️  Coverage threshold skipped (ran {len(affected)} affected test files only)")
+                return self.result()
+
+            reports = [pathlib.Path(tmp_dir) / f"coverage-{i}.json" for i in range(len(runs))]
+            coverage = read_coverage_reports(reports)
+
+        if coverage is None:
+            self.warn("Could not read coverage report")
+        elif coverage >= min_coverage:
+            self.success(f"Coverage: {coverage}% (>= {min_coverage}%)")
+        else:
+            self.error(f"Coverage too low: {coverage}% (minimum {min_coverage}%)")
 
         return self.result()
 
+    def _test_files(self) -> List[str]:
+        """
+        Test files under tests/ as pytest collects them
+
+        Asks ``pytest --collect-only`` so project settings such as
+        ``python_files`` decide what gets sharded. Falls back to
+        TEST_PATTERNS if collection fails or its output cannot be parsed.
+        """
+        try:
+            res = subprocess.run(["pytest", "--collect-only", "-q", "tests/"],
+                                 capture_output=True, text=True, timeout=self.TIMEOUT)
+        except (FileNotFoundError, subprocess.TimeoutExpired):
+            res = None
+
+        # Exit code 5: nothing collected
+        if res is not None and res.returncode == 5:
+            return []
+        if res is not None and res.returncode == 0:
+            files = set()
+            for line in res.stdout.splitlines():
+                # "path::test" node ids, or "path: N" when addopts adds -q
+                if "::" in line:
+                    files.add(line.split("::", 1)[0])
+                elif re.match(r'^\S.*: \d+$', line):
+                    files.add(line.rsplit(": ", 1)[0])
+            files = {f for f in files if self.index.exists(f)}
+            if files:
+                return sorted(files)
+
+        self.log("Could not list tests with pytest --collect-only, using TEST_PATTERNS")
+        files = set()
+        for pattern in self.TEST_PATTERNS:
+            files.update(path.as_posix() for path in self.index.glob(pattern))
+        return sorted(files)
+
+    def _shard(self, targets: List[str], shards: int) -> List[List[str]]:
+        """
+        Split test targets into at most ``shards`` groups of similar size
+
+        Largest files are placed first, each into the currently lightest
+        shard, so the split is deterministic for a given tree.
+        """
+        if shards <= 1 or len(targets) <= 1:
+            return [targets]
+
+        def size(target: str) -> int:
+            try:
+                return os.path.getsize(target)
+            except OSError:
+                return 0
+
+        groups: List[List[str]] = [[] for _ in range(min(shards, len(targets)))]
+        loads = [0] * len(groups)
+        for target in sorted(targets, key=lambda t: (-size(t), t)):
+            lightest = loads.index(min(loads))
+            groups[lightest].append(target)
+            loads[lightest] += size(target)
+        return [sorted(group) for group in groups]
+
+    def _run_pytest(self, targets: List[List[str]], tmp_dir: pathlib.Path,
+                    record_contexts: bool) -> List[subprocess.CompletedProcess]:
+        """
+        Run one pytest process per shard concurrently, each with its own coverage files
+
+        Output goes to per-shard files rather than pipes, so a shard with a
+        full pipe buffer never waits for the shards collected before it.
+        """
+        procs = []
+        try:
+            for i, shard in enumerate(targets):
+                cmd = ["pytest", *shard, "-v", "--cov=src", "--cov-report=term",
+                       f"--cov-report=json:{tmp_dir / f'coverage-{i}.json'}"]
+                if record_contexts:
+                    cmd.append("--cov-context=test")
+                env = dict(os.environ, COVERAGE_FILE=str(tmp_dir / f".coverage.{i}"))
+                out_path, err_path = tmp_dir / f"pytest-{i}.out", tmp_dir / f"pytest-{i}.err"
+                with open(out_path, 'w', encoding='utf-8') as out, \
+                        open(err_path, 'w', encoding='utf-8') as err:
+                    procs.append((cmd, out_path, err_path,
+                                  subprocess.Popen(cmd, stdout=out, stderr=err, env=env)))
+
+            deadline = time.monotonic() + self.TIMEOUT
+            runs = []
+            for cmd, out_path, err_path, proc in procs:
+                proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+                runs.append(subprocess.CompletedProcess(
+                    cmd, proc.returncode,
+                    out_path.read_text(encoding='utf-8', errors='replace'),
+                    err_path.read_text(encoding='utf-8', errors='replace')))
+            return runs
+        finally:
+            for *_, proc in procs:
+                if proc.poll() is None:
+                    proc.kill()
+                    proc.wait()
+
+    def _affected_tests(self, since: str, coverage_map: Optional[str]) -> Optional[List[str]]:
+        """
+        Test files affected by changes since a git ref
+
+        Returns:
+            Sorted test files, or None when the full suite must run (no
+            coverage map; a changed conftest, test config file or non-test
+            file under tests/; a changed non-Python file under src/; or a
+            changed source file the map has never seen or has no tests for)
+
+        Raises:
+            RuntimeError: If git cannot diff against ``since``
+        """
+        mapping = self._load_coverage_map(coverage_map) if coverage_map else None
+        if mapping is None:
+            self.log("No coverage map available, running full suite")
+            return None
+
+        changed, removed = git_changes(since)
+        tests = set()
+
+        for path in sorted(changed | removed):
+            name = pathlib.PurePosixPath(path).name
+            if name == "conftest.py" or path in self.TEST_CONFIG_FILES:
+                self.log(f"{path} changed, running full suite")
+                return None
+            if path.startswith("tests/"):
+                if not self._is_test_file(path):
+                    # Helpers and fixture data: their importers are unknown
+                    self.log(f"{path} changed, running full suite")
+                    return None
+                if path in changed:
+                    tests.add(path)
+            elif path.startswith("src/"):
+                if not path.endswith(".py"):
+                    # Data files, templates and stubs are not traced by coverage
+                    self.log(f"{path} changed, running full suite")
+                    return None
+                if path not in mapping:
+                    if path in changed:
+                        self.log(f"{path} not in coverage map, running full suite")
+                        return None
+                    continue
+                if not mapping[path]:
+                    # No recorded test context: cannot tell which tests depend on it
+                    self.log(f"{path} has no tests in coverage map, running full suite")
+                    return None
+                tests.update(mapping[path])
+
+        return sorted(t for t in tests if self.index.exists(t))
+
+    def _is_test_file(self, path: str) -> bool:
+        """Whether path is a test module pytest collects (per TEST_PATTERNS)"""
+        name = pathlib.PurePosixPath(path).name
+        return any(fnmatch.fnmatchcase(name, pattern.rsplit("/", 1)[-1])
+                   for pattern in self.TEST_PATTERNS)
+
+    def _load_coverage_map(self, coverage_map: str) -> Optional[Dict[str, List[str]]]:
+        """Load the src → tests map (None if missing or unreadable)"""
+        try:
+            with open(coverage_map, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != self.COVERAGE_MAP_VERSION:
+            return None
+        return data.get("files", {})
+
+    def _save_coverage_map(self, coverage_map: str, mapping: Dict[str, List[str]]):
+        """Persist the src → tests map"""
+        path = pathlib.Path(coverage_map)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.COVERAGE_MAP_VERSION, "files": mapping},
+                      f, indent=2, sort_keys=True)
+
     def _validate_node(self, min_coverage: int) -> ValidationResult:
         """Validate Node.js tests"""
         try:
@@ -301,8 +1003,8 @@ class Phase2Validator(PhaseValidator):
                 self.success("All tests passed")
             else:
                 self.error("Tests failed")
-                print(result.stdout)
-                print(result.stderr)
+                self.print(result.stdout)
+                self.print(result.stderr)
 
         except FileNotFoundError:
             self.error("npm not found")
@@ -312,6 +1014,164 @@ class Phase2Validator(PhaseValidator):
         return self.result()
 
 
+class Phase4Validator(PhaseValidator):
+    """Phase 4: Git Ops validation"""
+
+    def validate(self, own_files: Optional[List[str]] = None) -> ValidationResult:
+        """
+        Validate Phase 4: Working directory is clean
+
+        Args:
+            own_files: Cache files written by this run; not counted as changes
+                even when placed inside the working tree
+        """
+        self.print("\n🔍 Validating Phase 4 (Git Ops)...")
+
+        if sys.platform == "win32":
+            # Delegate to PowerShell script if available
+            ps_script = pathlib.Path("scripts/validate-phase-4.ps1")
+            if not self.index.exists(ps_script):
+                self.error("scripts/validate-phase-4.ps1 not found")
+                return self.result()
+
+            self.print("   Delegating to validate-phase-4.ps1...")
+            res = subprocess.run(
+                ["powershell", "-ExecutionPolicy", "Bypass", "-File", str(ps_script)],
+                capture_output=True,
+                text=True
+            )
+            self.print(res.stdout.rstrip())
+            if res.stderr.strip():
+                self.print(res.stderr.rstrip())
+            if res.returncode != 0:
+                self.error(f"validate-phase-4.ps1 failed (exit {res.returncode})")
+            return self.result()
+
+        # Simple cross-platform check: uncommitted changes
+        own = self._repo_paths(own_files or [])
+        cmd = ["git", "status", "--porcelain"]
+        if own:
+            # List untracked files individually so our caches can be told apart
+            cmd.append("--untracked-files=all")
+        res = subprocess.run(cmd, capture_output=True, text=True)
+        changes = [line for line in res.stdout.splitlines() if line[3:] not in own]
+        if changes:
+            self.error("Uncommitted changes detected")
+            self.print("\n".join(changes))
+        else:
+            self.success("Working directory clean")
+
+        return self.result()
+
+    @staticmethod
+    def _repo_paths(paths: List[str]) -> Set[str]:
+        """Repository-relative forms of paths (and their .tmp files) inside the work tree"""
+        if not paths:
+            return set()
+        res = subprocess.run(["git", "rev-parse", "--show-toplevel"], capture_output=True, text=True)
+        if res.returncode != 0:
+            return set()
+        top = os.path.realpath(res.stdout.strip())
+        own = set()
+        for path in paths:
+            rel = os.path.relpath(os.path.realpath(path), top)
+            if not rel.startswith(os.pardir):
+                rel = pathlib.PurePath(rel).as_posix()
+                own.update((rel, rel + ".tmp"))
+        return own
+
+
+# Phase → (validator class, requires PRD number), in canonical run/report order
+PHASES: Dict[str, Tuple[type, bool]] = {
+    "0": (Phase0Validator, True),
+    "0.5": (Phase05Validator, True),
+    "1": (Phase1Validator, False),
+    "2": (Phase2Validator, False),
+    "4": (Phase4Validator, False),
+}
+
+
+def parse_phases(spec: str) -> List[str]:
+    """
+    Expand a phase spec into canonical order
+
+    Args:
+        spec: "all", a single phase ("0.5") or comma-separated phases ("0,1,4")
+
+    Returns:
+        Deduplicated phase list ordered as in PHASES
+
+    Raises:
+        ValueError: If a phase is not supported
+    """
+    if spec == "all":
+        return list(PHASES)
+
+    requested = {p.strip() for p in spec.split(",") if p.strip()}
+    unknown = sorted(requested - set(PHASES))
+    if unknown:
+        raise ValueError(", ".join(unknown))
+    return [p for p in PHASES if p in requested]
+
+
+def run_phase(phase: str, prd_number: Optional[str], coverage: int, verbose: bool,
+              index: FileIndex, stream: Optional[TextIO] = None,
+              since: Optional[str] = None, pairing_cache: Optional[str] = None,
+              shards: int = 1, coverage_map: Optional[str] = None) -> ValidationResult:
+    """Run a single phase validator"""
+    validator_cls, needs_prd = PHASES[phase]
+    validator = validator_cls(verbose=verbose, index=index, stream=stream)
+
+    if needs_prd:
+        return validator.validate(prd_number)
+    elif phase == "1":
+        return validator.validate(since=since, cache_path=pairing_cache)
+    elif phase == "2":
+        return validator.validate(min_coverage=coverage, since=since,
+                                  shards=shards, coverage_map=coverage_map)
+    else:
+        own_files = [str(index.cache_path) if index.cache_path else None,
+                     pairing_cache, coverage_map]
+        return validator.validate(own_files=[path for path in own_files if path])
+
+
+def run_phases(phases: List[str], prd_number: Optional[str] = None, coverage: int = 80,
+               verbose: bool = False, jobs: Optional[int] = None,
+               index: Optional[FileIndex] = None,
+               **options) -> List[Tuple[str, ValidationResult, str]]:
+    """
+    Run several phase validators concurrently
+
+    Validators share one FileIndex and buffer their own output, so results
+    come back in the order of ``phases`` regardless of completion order.
+    ``options`` (since, pairing_cache, shards, coverage_map) are passed to
+    run_phase.
+
+    Returns:
+        List of (phase, result, captured output)
+    """
+    index = index or FileIndex()
+    buffers = {phase: io.StringIO() for phase in phases}
+
+    with ThreadPoolExecutor(max_workers=jobs or len(phases)) as pool:
+        futures = {
+            phase: pool.submit(run_phase, phase, prd_number, coverage, verbose,
+                               index, buffers[phase], **options)
+            for phase in phases
+        }
+        return [(phase, futures[phase].result(), buffers[phase].getvalue())
+                for phase in phases]
+
+
+def combine_results(results: List[ValidationResult]) -> ValidationResult:
+    """Overall result: any FAIL fails, otherwise any WARN warns"""
+    if ValidationResult.FAIL in results:
+        return ValidationResult.FAIL
+    elif ValidationResult.WARN in results:
+        return ValidationResult.WARN
+    return ValidationResult.PASS
+
+
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(
@@ -322,74 +1182,85 @@ Examples:
   python scripts/validate_phase_universal.py 0 0001       # Validate Phase 0
   python scripts/validate_phase_universal.py 0.5 0001     # Validate Phase 0.5
   python scripts/validate_phase_universal.py 1            # Validate Phase 1
+  python scripts/validate_phase_universal.py 1 --since HEAD  # Phase 1, changed files only
   python scripts/validate_phase_universal.py 2            # Validate Phase 2
   python scripts/validate_phase_universal.py 2 --coverage 90  # Custom coverage
+  python scripts/validate_phase_universal.py 2 --shards 4     # pytest in 4 worker processes
+  python scripts/validate_phase_universal.py all 0001     # Phases 0, 0.5, 1, 2, 4 concurrently
+  python scripts/validate_phase_universal.py 1,4          # Selected phases concurrently
         """
     )
 
-    parser.add_argument("phase", type=str, help="Phase to validate (0, 0.5, 1, 2, 3, 5, 6)")
+    parser.add_argument("phase", type=str,
+                        help="Phase to validate (0, 0.5, 1, 2, 4), comma-separated list, or 'all'")
     parser.add_argument("prd_number", nargs="?", help="PRD number (for Phase 0, 0.5)")
-    parser.add_argument("--coverage", type=int, default=80, help="Minimum coverage % (Phase 2)")
+    parser.add_argument("--coverage", type=int, default=80, help="Minimum coverage %% (Phase 2)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Worker threads for multi-phase runs (default: one per phase)")
+    parser.add_argument("--since", metavar="REF",
+                        help="Only check files changed since this git ref "
+                             "(Phase 1 pairs; Phase 2 affected tests, needs --coverage-map)")
+    parser.add_argument("--pairing-cache", metavar="PATH", nargs="?", const="",
+                        help="Phase 1: reuse/refresh pairing results for unchanged files "
+                             "(default PATH: .git/phase-validator/pairing.json)")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="Phase 2: split pytest across N worker processes")
+    parser.add_argument("--coverage-map", metavar="PATH", nargs="?", const="",
+                        help="Phase 2: src → tests map, rebuilt on full runs, used by --since "
+                             "(default PATH: .git/phase-validator/coverage-map.json)")
+    parser.add_argument("--index-cache", metavar="PATH", nargs="?", const="",
+                        help="Persist the file index; unchanged directories are not rescanned "
+                             "(default PATH: .git/phase-validator/index.json)")
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
 
     args = parser.parse_args()
 
-    # Validate based on phase
-    if args.phase == "0":
-        if not args.prd_number:
-            print("❌ PRD number required for Phase 0")
-            sys.exit(1)
-        validator = Phase0Validator(verbose=args.verbose)
-        result = validator.validate(args.prd_number)
+    try:
+        phases = parse_phases(args.phase)
+    except ValueError:
+        print(f"❌ Phase {args.phase} validation not yet implemented")
+        print(f"   Available: {', '.join(PHASES)}, all")
+        sys.exit(1)
 
-    elif args.phase == "0.5":
-        if not args.prd_number:
-            print("❌ PRD number required for Phase 0.5")
-            sys.exit(1)
-        validator = Phase05Validator(verbose=args.verbose)
-        result = validator.validate(args.prd_number)
+    if not phases:
+        print("❌ No phase given")
+        sys.exit(1)
 
-    elif args.phase == "1":
-        validator = Phase1Validator(verbose=args.verbose)
-        result = validator.validate()
+    for phase in phases:
+        if PHASES[phase][1] and not args.prd_number:
+            print(f"❌ PRD number required for Phase {phase}")
+            sys.exit(1)
 
-    elif args.phase == "2":
-        validator = Phase2Validator(verbose=args.verbose)
-        result = validator.validate(min_coverage=args.coverage)
+    for option, name in (("index_cache", "index.json"), ("pairing_cache", "pairing.json"),
+                         ("coverage_map", "coverage-map.json")):
+        if getattr(args, option) == "":
+            setattr(args, option, default_cache_path(name))
 
-    elif args.phase == "2":
-        validator = Phase2Validator(verbose=args.verbose)
-        result = validator.validate(min_coverage=args.coverage)
+    index = FileIndex(cache_path=args.index_cache)
 
-    elif args.phase == "4":
-        # Phase 4: Git Ops (Delegated to PowerShell on Windows, or simple check here)
-        print("\n🔍 Validating Phase 4 (Git Ops)...")
-        if sys.platform == "win32":
-            # Delegate to PowerShell script if available
-            ps_script = pathlib.Path("scripts/validate-phase-4.ps1")
-            if ps_script.exists():
-                print("   Delegating to validate-phase-4.ps1...")
-                res = subprocess.run(["powershell", "-ExecutionPolicy", "Bypass", "-File", str(ps_script)])
-                sys.exit(res.returncode)
-            else:
-                print("❌ scripts/validate-phase-4.ps1 not found")
-                sys.exit(1)
-        else:
-            # Simple cross-platform check
-            # 1. Check for uncommitted changes
-            res = subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True)
-            if res.stdout.strip():
-                print("❌ Uncommitted changes detected")
-                print(res.stdout)
-                sys.exit(1)
-            else:
-                print("✅ Working directory clean")
-                result = ValidationResult.PASS
+    options = {
+        "since": args.since,
+        "pairing_cache": args.pairing_cache,
+        "shards": args.shards,
+        "coverage_map": args.coverage_map,
+    }
 
+    if len(phases) == 1:
+        # Single phase: stream output directly
+        result = run_phase(phases[0], args.prd_number, args.coverage, args.verbose, index,
+                           **options)
     else:
-        print(f"❌ Phase {args.phase} validation not yet implemented")
-        print("   Available: 0, 0.5, 1, 2, 4")
-        sys.exit(1)
+        outcomes = run_phases(phases, args.prd_number, args.coverage, args.verbose,
+                              args.jobs, index, **options)
+        for _, _, output in outcomes:
+            print(output, end="")
+
+        print("\n📋 Summary:")
+        for phase, phase_result, _ in outcomes:
+            print(f"   Phase {phase}: {phase_result.value}")
+        result = combine_results([r for _, r, _ in outcomes])
+
+    index.save()
 
     # Print final result
     print(f"\n{result.value}")
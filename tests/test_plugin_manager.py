@@ -0,0 +1,859 @@
+#!/usr/bin/env python3
+"""
+Tests for the plugin manager CLI
+
+Usage:
+    pytest tests/test_plugin_manager.py -v
+"""
+
+import pytest
+import sys
+import os
+import json
+import shutil
+import subprocess
+import tarfile
+
+# scripts 디렉토리를 Python path에 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from plugin_manager import (
+    CorruptObjectError,
+    FileHashCache,
+    FileRegistrySource,
+    GitMirrorSource,
+    ObjectStore,
+    PluginManager,
+    dependency_order,
+    diff_merkle,
+    merkle_tree,
+    scan_plugin_spans,
+)
+
+SCRIPT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts', 'plugin_manager.py'))
+
+
+def make_plugin(plugin_id, version="1.0.0", **extra):
+    """Registry entry in the shape of .claude-plugin/registry.json"""
+    plugin = {
+        "id": plugin_id,
+        "version": version,
+        "source": {"type": "local"},
+        "localPath": f".claude/plugins/{plugin_id}",
+        "localChanges": [],
+        "status": "active",
+    }
+    plugin.update(extra)
+    return plugin
+
+
+def write_registry(path, plugins, indent=2):
+    registry = {"version": "1.0.0", "plugins": plugins, "remoteRepositories": []}
+    path.write_text(json.dumps(registry, indent=indent, ensure_ascii=False), encoding="utf-8")
+
+
+@pytest.fixture
+def registry_path(tmp_path):
+    path = tmp_path / ".claude-plugin" / "registry.json"
+    path.parent.mkdir()
+    write_registry(path, [make_plugin(f"plugin-{n:04d}") for n in range(500)])
+    return path
+
+
+@pytest.fixture
+def manager(registry_path):
+    return PluginManager(str(registry_path))
+
+
+class TestScanPluginSpans:
+    """Byte spans of registry entries"""
+
+    @pytest.mark.parametrize("indent", [None, 2])
+    def test_spans_decode_to_entries(self, tmp_path, indent):
+        plugins = [make_plugin("한글-plugin", notes="설명 ✅"), make_plugin("ascii")]
+        path = tmp_path / "registry.json"
+        write_registry(path, plugins, indent=indent)
+        data = path.read_bytes()
+
+        spans = scan_plugin_spans(data)
+
+        assert [pid for pid, _, _ in spans] == ["한글-plugin", "ascii"]
+        for (_, offset, length), plugin in zip(spans, plugins):
+            assert json.loads(data[offset:offset + length].decode("utf-8")) == plugin
+
+    def test_plugins_key_after_other_keys(self):
+        data = b'{"a": {"plugins": []}, "b": [1, 2], "plugins": [{"id": "x"}]}'
+
+        assert scan_plugin_spans(data) == [("x", data.index(b'{"id"'), len(b'{"id": "x"}'))]
+
+    def test_invalid_registry(self):
+        with pytest.raises(ValueError):
+            scan_plugin_spans(b'[]')
+        with pytest.raises(ValueError):
+            scan_plugin_spans(b'{"plugins": [')
+
+
+class TestRegistryIndex:
+    """Indexed lookups and lazy loading"""
+
+    def test_info_does_not_load_registry(self, manager, capsys):
+        manager.info("plugin-0321")
+
+        assert "📦 Plugin: plugin-0321" in capsys.readouterr().out
+        assert manager._registry is None
+
+    def test_unknown_plugin(self, manager, capsys):
+        manager.info("missing")
+
+        assert "Plugin not found: missing" in capsys.readouterr().out
+
+    def test_index_persisted_next_to_registry(self, manager, registry_path):
+        manager.info("plugin-0001")
+
+        assert (registry_path.parent / ".cache" / "registry-index.sqlite").exists()
+        assert PluginManager(str(registry_path)).index.ids()[:2] == ["plugin-0000", "plugin-0001"]
+
+    def test_index_rebuilt_when_registry_changes(self, manager, registry_path):
+        assert manager._find_plugin("plugin-0001")["version"] == "1.0.0"
+
+        write_registry(registry_path, [make_plugin("plugin-0001", version="2.0.0"),
+                                       make_plugin("extra-plugin-with-longer-id")])
+        stat = registry_path.stat()
+        os.utime(registry_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        fresh = PluginManager(str(registry_path))
+        assert fresh._find_plugin("plugin-0001")["version"] == "2.0.0"
+        assert fresh._find_plugin("plugin-0002") is None
+
+    def test_loaded_registry_returns_live_entry(self, manager):
+        plugins = manager.registry["plugins"]
+
+        assert manager._find_plugin("plugin-0007") is plugins[7]
+
+    def test_missing_registry(self, tmp_path):
+        manager = PluginManager(str(tmp_path / "registry.json"))
+
+        assert manager._find_plugin("anything") is None
+        assert manager.registry == {"plugins": [], "remoteRepositories": []}
+
+
+def upstream_plugin(plugin_id, version, url, path=None):
+    """Registry entry tracking an upstream marketplace"""
+    return make_plugin(
+        plugin_id, version,
+        source={"type": "upstream", "url": url, "commit": "main",
+                "path": path or f"plugins/{plugin_id}"},
+        upstream={"repository": "acme/agents", "license": "MIT", "author": {"name": "Acme"}},
+    )
+
+
+def marketplace(**versions):
+    return {
+        "name": "acme",
+        "plugins": [{"name": name.replace("_", "-"), "source": f"./plugins/{name.replace('_', '-')}",
+                     "version": version} for name, version in versions.items()],
+    }
+
+
+def git(cwd, *args):
+    """Run git with a throwaway identity"""
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com",
+         "-c", "commit.gpgsign=false", *args],
+        cwd=cwd, check=True, capture_output=True, text=True,
+    ).stdout
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    """Bare git mirror at <root>/acme/agents.git with a marketplace manifest"""
+    work = tmp_path / "work"
+    (work / ".claude-plugin").mkdir(parents=True)
+    git(tmp_path, "init", "-q", "-b", "main", str(work))
+
+    def publish(manifest, files=None, tag=None):
+        (work / ".claude-plugin" / "marketplace.json").write_text(json.dumps(manifest), encoding="utf-8")
+        for rel, content in (files or {}).items():
+            (work / rel).parent.mkdir(parents=True, exist_ok=True)
+            (work / rel).write_text(content, encoding="utf-8")
+        git(work, "add", "-A")
+        git(work, "commit", "-q", "-m", "publish")
+        if tag:
+            git(work, "tag", tag)
+        git(work, "push", "-q", "--force", "--tags", str(root / "acme" / "agents.git"), "main")
+
+    root = tmp_path / "mirror"
+    (root / "acme").mkdir(parents=True)
+    git(tmp_path, "init", "-q", "--bare", "-b", "main", str(root / "acme" / "agents.git"))
+    return root, publish
+
+
+class CountingSource:
+    """Wraps an update source and counts manifest fetches"""
+
+    def __init__(self, source):
+        self.source = source
+        self.name = source.name
+        self.fetches = 0
+
+    def locate(self, plugin):
+        return self.source.locate(plugin)
+
+    def probe(self, location, ref):
+        return self.source.probe(location, ref)
+
+    def fetch(self, location, ref, validator):
+        self.fetches += 1
+        return self.source.fetch(location, ref, validator)
+
+
+class TestCheckUpdates:
+    """Update checks against local stand-ins for GitHub"""
+
+    def test_git_mirror(self, tmp_path, mirror, capsys):
+        root, publish = mirror
+        publish(marketplace(python_development="1.3.0", debugging_toolkit="1.2.0"))
+        registry = tmp_path / "registry.json"
+        url = "https://github.com/acme/agents"
+        write_registry(registry, [
+            upstream_plugin("python-development", "1.2.0", url),
+            upstream_plugin("debugging-toolkit", "1.2.0", url),
+            make_plugin("local-only"),
+        ])
+
+        results = PluginManager(str(registry)).check_updates([GitMirrorSource(str(root))])
+
+        assert [(r["id"], r["latest"], r["status"]) for r in results] == [
+            ("python-development", "1.3.0", "update-available"),
+            ("debugging-toolkit", "1.2.0", "up-to-date"),
+        ]
+        assert "1 updates available" in capsys.readouterr().out
+
+    def test_unchanged_upstream_is_not_refetched(self, tmp_path, mirror):
+        root, publish = mirror
+        publish(marketplace(python_development="1.3.0"))
+        registry = tmp_path / "registry.json"
+        write_registry(registry, [upstream_plugin("python-development", "1.2.0",
+                                                  "https://github.com/acme/agents")])
+        source = CountingSource(GitMirrorSource(str(root)))
+
+        PluginManager(str(registry)).check_updates([source])
+        second = PluginManager(str(registry)).check_updates([source])
+        assert source.fetches == 1
+        assert second[0]["latest"] == "1.3.0" and second[0]["fetched"] is False
+
+        publish(marketplace(python_development="1.4.0"))
+        third = PluginManager(str(registry)).check_updates([source])
+        assert source.fetches == 2
+        assert third[0]["latest"] == "1.4.0"
+
+    def test_file_registry(self, tmp_path, capsys):
+        upstream = tmp_path / "upstream"
+        (upstream / ".claude-plugin").mkdir(parents=True)
+        manifest = upstream / ".claude-plugin" / "marketplace.json"
+        manifest.write_text(json.dumps(marketplace(python_development="1.2.0")), encoding="utf-8")
+        registry = tmp_path / "registry.json"
+        write_registry(registry, [
+            upstream_plugin("python-development", "1.2.0", upstream.as_uri()),
+            upstream_plugin("renamed", "0.1.0", upstream.as_uri(), path="plugins/python-development"),
+        ])
+        source = CountingSource(FileRegistrySource())
+
+        results = PluginManager(str(registry)).check_updates([source], as_json=True)
+
+        assert json.loads(capsys.readouterr().out) == results
+        assert [r["status"] for r in results] == ["up-to-date", "update-available"]
+        assert source.fetches == 1  # both plugins share one upstream
+
+    def test_unreachable_upstream(self, tmp_path, capsys):
+        registry = tmp_path / "registry.json"
+        write_registry(registry, [
+            upstream_plugin("gone", "1.0.0", (tmp_path / "missing.json").as_uri()),
+            upstream_plugin("github-only", "1.0.0", "https://github.com/acme/agents"),
+        ])
+
+        results = PluginManager(str(registry)).check_updates()
+
+        assert [r["status"] for r in results] == ["error", "no-source"]
+        assert "could not be checked" in capsys.readouterr().out
+
+
+class TestObjectStore:
+    """Content-addressed storage and materialized trees"""
+
+    def test_identical_files_stored_once(self, tmp_path):
+        src = tmp_path / "src"
+        (src / "agents").mkdir(parents=True)
+        (src / "agents" / "a.md").write_text("same", encoding="utf-8")
+        (src / "b.md").write_text("same", encoding="utf-8")
+        store = ObjectStore(tmp_path / "store")
+
+        store.add_tree(src)
+
+        assert len(list((tmp_path / "store" / "objects").rglob("*"))) == 2  # one dir, one object
+
+    def test_materialized_files_are_independent_and_keep_exec_bit(self, tmp_path):
+        src = tmp_path / "src"
+        src.mkdir()
+        (src / "README.md").write_text("doc", encoding="utf-8")
+        (src / "run.sh").write_text("#!/bin/sh\n", encoding="utf-8")
+        (src / "run.sh").chmod(0o755)
+        store = ObjectStore(tmp_path / "store")
+        tree = store.add_tree(src)
+
+        stats = store.materialize(tree, tmp_path / "one" / "plugin")
+        store.materialize(tree, tmp_path / "two" / "plugin")
+
+        assert stats["reflinked"] + stats["copied"] == 2
+        first = tmp_path / "one" / "plugin" / "README.md"
+        assert os.access(first, os.W_OK)
+        first.write_text("edited in place", encoding="utf-8")
+        assert (tmp_path / "two" / "plugin" / "README.md").read_text(encoding="utf-8") == "doc"
+        assert store.materialize(tree, tmp_path / "three" / "plugin")
+        assert (tmp_path / "three" / "plugin" / "README.md").read_text(encoding="utf-8") == "doc"
+        assert os.access(tmp_path / "one" / "plugin" / "run.sh", os.X_OK)
+        assert not os.access(tmp_path / "one" / "plugin" / "README.md", os.X_OK)
+
+    def test_corrupt_object_is_detected_and_repaired(self, tmp_path):
+        src = tmp_path / "src"
+        src.mkdir()
+        (src / "a.md").write_text("pristine", encoding="utf-8")
+        store = ObjectStore(tmp_path / "store")
+        tree = store.add_tree(src)
+
+        # Object modified in place, as through a hardlink from older installs
+        obj = next(p for p in (tmp_path / "store" / "objects").rglob("*") if p.is_file())
+        obj.chmod(0o644)
+        obj.write_text("edited locally\n", encoding="utf-8")
+
+        with pytest.raises(CorruptObjectError):
+            store.materialize(tree, tmp_path / "plugin")
+        assert not (tmp_path / "plugin").exists()
+
+        assert store.add_tree(src) == tree
+        store.materialize(tree, tmp_path / "plugin")
+        assert (tmp_path / "plugin" / "a.md").read_text(encoding="utf-8") == "pristine"
+
+    def test_materialize_replaces_previous_tree(self, tmp_path):
+        store = ObjectStore(tmp_path / "store")
+        for version, files in (("v1", ["old.md", "keep.md"]), ("v2", ["keep.md"])):
+            (tmp_path / version).mkdir()
+            for name in files:
+                (tmp_path / version / name).write_text(version, encoding="utf-8")
+
+        dest = tmp_path / "plugin"
+        store.materialize(store.add_tree(tmp_path / "v1"), dest)
+        store.materialize(store.add_tree(tmp_path / "v2"), dest)
+
+        assert sorted(p.name for p in dest.iterdir()) == ["keep.md"]
+        assert (dest / "keep.md").read_text(encoding="utf-8") == "v2"
+        assert sorted(p.name for p in tmp_path.iterdir() if p.name.startswith(".plugin")) == []
+
+
+class TestInstall:
+    """install / update through the object store"""
+
+    @pytest.fixture
+    def project(self, tmp_path, monkeypatch):
+        project = tmp_path / "project"
+        (project / ".claude-plugin").mkdir(parents=True)
+        write_registry(project / ".claude-plugin" / "registry.json", [make_plugin("local-only")])
+        monkeypatch.chdir(project)
+        return project
+
+    def manager(self, tmp_path):
+        return PluginManager(".claude-plugin/registry.json", store_dir=str(tmp_path / "store"))
+
+    def test_install_and_switch_versions_from_git_mirror(self, tmp_path, project, mirror):
+        root, publish = mirror
+        publish(marketplace(python_development="1.2.0"),
+                {"plugins/python-development/agents/pro.md": "v1",
+                 "plugins/python-development/README.md": "readme"}, tag="v1.2.0")
+        publish(marketplace(python_development="1.3.0"),
+                {"plugins/python-development/agents/pro.md": "v2"}, tag="v1.3.0")
+        sources = [GitMirrorSource(str(root))]
+        plugin_dir = project / ".claude" / "plugins" / "python-development"
+
+        assert self.manager(tmp_path).install(
+            "python-development@1.2.0", "https://github.com/acme/agents", sources=sources)
+        assert (plugin_dir / "agents" / "pro.md").read_text(encoding="utf-8") == "v1"
+
+        assert self.manager(tmp_path).update("python-development", sources=sources)
+        assert (plugin_dir / "agents" / "pro.md").read_text(encoding="utf-8") == "v2"
+        assert (plugin_dir / "README.md").read_text(encoding="utf-8") == "readme"
+
+        registry = json.loads((project / ".claude-plugin" / "registry.json").read_text(encoding="utf-8"))
+        entry = registry["plugins"][1]
+        assert (entry["id"], entry["version"]) == ("python-development", "1.3.0")
+        assert entry["upstream"] == {"repository": "acme/agents"}
+        assert entry["treeHash"]
+
+        assert self.manager(tmp_path).update("python-development", sources=sources)
+        assert self.manager(tmp_path).update("python-development@1.2.0", sources=sources)
+        assert (plugin_dir / "agents" / "pro.md").read_text(encoding="utf-8") == "v1"
+
+    def test_info_on_installed_plugin(self, tmp_path, project, mirror, capsys):
+        root, publish = mirror
+        publish(marketplace(python_development="1.2.0"),
+                {"plugins/python-development/agents/pro.md": "v1"}, tag="v1.2.0")
+        manager = self.manager(tmp_path)
+        assert manager.install("python-development@1.2.0", "https://github.com/acme/agents",
+                               sources=[GitMirrorSource(str(root))])
+        capsys.readouterr()
+
+        manager.info("python-development")
+
+        out = capsys.readouterr().out
+        assert "Repository: acme/agents" in out
+        assert "License:" not in out and "Author:" not in out
+        assert "Local Path: .claude/plugins/python-development" in out
+
+    def test_install_from_file_url(self, tmp_path, project):
+        upstream = tmp_path / "upstream"
+        (upstream / ".claude-plugin").mkdir(parents=True)
+        (upstream / ".claude-plugin" / "marketplace.json").write_text(
+            json.dumps(marketplace(review="0.3.0")), encoding="utf-8")
+        (upstream / "agents").mkdir()
+        (upstream / "agents" / "reviewer.md").write_text("review", encoding="utf-8")
+        manager = self.manager(tmp_path)
+
+        assert not manager.install("review@9.9.9", upstream.as_uri(), path="agents")
+        assert manager.install("review", upstream.as_uri(), path="agents")
+
+        assert (project / ".claude" / "plugins" / "review" / "reviewer.md").exists()
+        assert manager._find_plugin("review")["version"] == "0.3.0"
+
+    def test_edit_in_one_project_does_not_reach_another(self, tmp_path, project, monkeypatch):
+        upstream = tmp_path / "upstream"
+        (upstream / ".claude-plugin").mkdir(parents=True)
+        (upstream / ".claude-plugin" / "marketplace.json").write_text(
+            json.dumps(marketplace(foo="1.0.0")), encoding="utf-8")
+        (upstream / "plugins" / "foo").mkdir(parents=True)
+        (upstream / "plugins" / "foo" / "a.md").write_text("upstream\n", encoding="utf-8")
+        assert self.manager(tmp_path).install("foo", upstream.as_uri())
+
+        (project / ".claude" / "plugins" / "foo" / "a.md").write_text("edited locally\n", encoding="utf-8")
+
+        other = tmp_path / "other"
+        (other / ".claude-plugin").mkdir(parents=True)
+        write_registry(other / ".claude-plugin" / "registry.json", [])
+        monkeypatch.chdir(other)
+        assert self.manager(tmp_path).install("foo", upstream.as_uri())
+        assert (other / ".claude" / "plugins" / "foo" / "a.md").read_text(encoding="utf-8") == "upstream\n"
+
+    def file_upstream(self, tmp_path, version, files):
+        upstream = tmp_path / "upstream"
+        (upstream / ".claude-plugin").mkdir(parents=True, exist_ok=True)
+        (upstream / ".claude-plugin" / "marketplace.json").write_text(
+            json.dumps(marketplace(foo=version)), encoding="utf-8")
+        for rel, content in files.items():
+            (upstream / "plugins" / "foo" / rel).parent.mkdir(parents=True, exist_ok=True)
+            (upstream / "plugins" / "foo" / rel).write_text(content, encoding="utf-8")
+        return upstream.as_uri()
+
+    def test_update_refuses_to_discard_local_changes(self, tmp_path, project, capsys):
+        url = self.file_upstream(tmp_path, "1.0.0", {"a.md": "a"})
+        assert self.manager(tmp_path).install("foo", url)
+        plugin_dir = project / ".claude" / "plugins" / "foo"
+        (plugin_dir / "mine.md").write_text("mine", encoding="utf-8")
+        (plugin_dir / "a.md").write_text("a, tuned", encoding="utf-8")
+        self.file_upstream(tmp_path, "1.1.0", {"b.md": "b"})
+        capsys.readouterr()
+
+        assert not self.manager(tmp_path).update("foo")
+
+        out = capsys.readouterr().out
+        assert "M a.md" in out and "A mine.md" in out and "--force" in out
+        assert sorted(p.name for p in plugin_dir.iterdir()) == ["a.md", "mine.md"]
+
+        assert self.manager(tmp_path).update("foo", force=True)
+        assert sorted(p.name for p in plugin_dir.iterdir()) == ["a.md", "b.md"]
+
+    def test_update_without_local_changes(self, tmp_path, project):
+        url = self.file_upstream(tmp_path, "1.0.0", {"a.md": "a"})
+        assert self.manager(tmp_path).install("foo", url)
+        self.file_upstream(tmp_path, "1.1.0", {"a.md": "a2"})
+
+        assert self.manager(tmp_path).update("foo")
+        assert (project / ".claude" / "plugins" / "foo" / "a.md").read_text(encoding="utf-8") == "a2"
+
+    def test_update_cli_exit_code(self, tmp_path, project, monkeypatch):
+        url = self.file_upstream(tmp_path, "1.0.0", {"a.md": "a"})
+        assert self.manager(tmp_path).install("foo", url)
+        monkeypatch.setenv("CLAUDE_PLUGIN_STORE", str(tmp_path / "store"))
+
+        def run(*args):
+            return subprocess.run([sys.executable, SCRIPT, *args], capture_output=True, text=True)
+
+        assert run("update", "foo").returncode == 0  # already installed
+        (project / ".claude" / "plugins" / "foo" / "a.md").write_text("mine", encoding="utf-8")
+        self.file_upstream(tmp_path, "1.1.0", {"a.md": "a2"})
+        assert run("update", "foo").returncode == 1  # refused: local changes
+        assert run("update", "missing").returncode == 1
+        assert run("update", "foo", "--force").returncode == 0
+
+    def test_install_over_unmanaged_directory_needs_force(self, tmp_path, project, capsys):
+        url = self.file_upstream(tmp_path, "1.0.0", {"a.md": "a"})
+        plugin_dir = project / ".claude" / "plugins" / "foo"
+        plugin_dir.mkdir(parents=True)
+        (plugin_dir / "notes.md").write_text("vendored by hand", encoding="utf-8")
+
+        assert not self.manager(tmp_path).install("foo", url)
+        assert "no recorded installed tree" in capsys.readouterr().out
+        assert (plugin_dir / "notes.md").exists()
+
+        assert self.manager(tmp_path).install("foo", url, force=True)
+        assert sorted(p.name for p in plugin_dir.iterdir()) == ["a.md"]
+
+    def test_install_existing_plugin_is_refused(self, tmp_path, project, capsys):
+        assert not self.manager(tmp_path).install("local-only", "file:///nowhere")
+        assert "already installed" in capsys.readouterr().out
+
+    def test_save_registry_is_atomic(self, tmp_path, project, monkeypatch):
+        manager = self.manager(tmp_path)
+        registry_path = project / ".claude-plugin" / "registry.json"
+        before = registry_path.read_text(encoding="utf-8")
+        manager.registry["plugins"].append({"id": "broken", "bad": object()})
+
+        with pytest.raises(TypeError):
+            manager._save_registry()
+
+        assert registry_path.read_text(encoding="utf-8") == before
+        assert sorted(p.name for p in registry_path.parent.iterdir()) == ["registry.json"]
+
+
+class TestMerkleDiff:
+    """Merkle tree comparison"""
+
+    def test_equal_trees_have_equal_hash(self):
+        files = {"a.md": "1", "agents/b.md": "2", "agents/deep/c.md": "3"}
+
+        assert merkle_tree(files)["hash"] == merkle_tree(dict(reversed(list(files.items()))))["hash"]
+        assert diff_merkle(merkle_tree(files), merkle_tree(files)) == []
+
+    def test_reports_only_differing_files(self):
+        upstream = {"a.md": "1", "agents/b.md": "2", "agents/c.md": "3", "old/d.md": "4"}
+        local = {"a.md": "1", "agents/b.md": "changed", "agents/c.md": "3", "new/e.md": "5"}
+
+        assert diff_merkle(merkle_tree(local), merkle_tree(upstream)) == [
+            ("M", "agents/b.md"), ("A", "new/e.md"), ("D", "old/d.md")]
+
+    def test_equal_subtrees_are_not_visited(self):
+        shared = {f"same/{n}.md": str(n) for n in range(3)}
+        local = merkle_tree({**shared, "x.md": "1"})
+        upstream = merkle_tree({**shared, "x.md": "2"})
+        # Corrupt the file map of the shared subtree: unreachable if skipped by hash
+        local["dirs"]["same"]["files"] = None
+
+        assert diff_merkle(local, upstream) == [("M", "x.md")]
+
+
+class TestFileHashCache:
+    """Hashes cached by mtime and size"""
+
+    def test_git_blob_hash_matches_git(self, tmp_path):
+        path = tmp_path / "file.md"
+        path.write_text("hello\n", encoding="utf-8")
+        expected = subprocess.run(["git", "hash-object", str(path)],
+                                  capture_output=True, text=True).stdout.strip()
+
+        assert FileHashCache(tmp_path / "c.json").hash_file(path, "git-blob") == expected
+
+    def test_unchanged_files_are_not_rehashed(self, tmp_path, monkeypatch):
+        (tmp_path / "d").mkdir()
+        (tmp_path / "d" / "a.md").write_text("a", encoding="utf-8")
+        cache = FileHashCache(tmp_path / "cache.json")
+        first = cache.hash_directory(tmp_path / "d", "sha256")
+        cache.save()
+
+        reloaded = FileHashCache(tmp_path / "cache.json")
+        monkeypatch.setattr("plugin_manager.hashlib.sha256",
+                            lambda *a: pytest.fail("file was rehashed"))
+        assert reloaded.hash_directory(tmp_path / "d", "sha256") == first
+
+
+class TestDiffUpstream:
+    """diff-upstream against the install tree and a git mirror"""
+
+    @pytest.fixture
+    def project(self, tmp_path, monkeypatch):
+        project = tmp_path / "project"
+        (project / ".claude-plugin").mkdir(parents=True)
+        write_registry(project / ".claude-plugin" / "registry.json", [])
+        monkeypatch.chdir(project)
+        return project
+
+    def test_against_installed_tree(self, tmp_path, project, capsys):
+        upstream = tmp_path / "upstream"
+        (upstream / ".claude-plugin").mkdir(parents=True)
+        (upstream / ".claude-plugin" / "marketplace.json").write_text(
+            json.dumps(marketplace(review="1.0.0")), encoding="utf-8")
+        (upstream / "plugins" / "review" / "agents").mkdir(parents=True)
+        (upstream / "plugins" / "review" / "agents" / "reviewer.md").write_text("line 1\n", encoding="utf-8")
+        (upstream / "plugins" / "review" / "README.md").write_text("readme\n", encoding="utf-8")
+        manager = PluginManager(".claude-plugin/registry.json", store_dir=str(tmp_path / "store"))
+        manager.install("review", upstream.as_uri())
+        local = project / ".claude" / "plugins" / "review"
+
+        assert manager.diff_upstream("review") == []
+
+        # Edit by replacing the file, as many editors do
+        (local / "agents" / "reviewer.md").unlink()
+        (local / "agents" / "reviewer.md").write_text("line 1 edited\n", encoding="utf-8")
+        (local / "README.md").unlink()
+        (local / "notes.md").write_text("mine\n", encoding="utf-8")
+        capsys.readouterr()
+
+        changes = PluginManager(".claude-plugin/registry.json", store_dir=str(tmp_path / "store")) \
+            .diff_upstream("review", unified=True)
+
+        assert changes == [("D", "README.md"), ("M", "agents/reviewer.md"), ("A", "notes.md")]
+        out = capsys.readouterr().out
+        assert "-line 1\n+line 1 edited" in out
+        assert "upstream/agents/reviewer.md" in out
+
+    def test_against_git_mirror(self, tmp_path, project, mirror, capsys):
+        root, publish = mirror
+        publish(marketplace(python_development="1.2.0"),
+                {"plugins/python-development/agents/pro.md": "pro\n",
+                 "plugins/python-development/README.md": "readme\n"}, tag="v1.2.0")
+        local = project / ".claude" / "plugins" / "python-development"
+        (local / "agents").mkdir(parents=True)
+        (local / "agents" / "pro.md").write_text("pro\n", encoding="utf-8")
+        (local / "README.md").write_text("readme\n", encoding="utf-8")
+        write_registry(project / ".claude-plugin" / "registry.json", [
+            upstream_plugin("python-development", "1.2.0", "https://github.com/acme/agents")])
+        manager = PluginManager(".claude-plugin/registry.json")
+        sources = [GitMirrorSource(str(root))]
+
+        assert manager.diff_upstream("python-development", sources) == []
+
+        (local / "agents" / "pro.md").write_text("pro, tuned\n", encoding="utf-8")
+        assert manager.diff_upstream("python-development", sources) == [("M", "agents/pro.md")]
+
+        manager.list_plugins(verbose=True, sources=sources)
+        assert "Diff: 1 modified" in capsys.readouterr().out
+
+    def test_installed_version_missing_upstream(self, tmp_path, project, mirror, capsys):
+        root, publish = mirror
+        publish(marketplace(python_development="1.3.0"),
+                {"plugins/python-development/agents/pro.md": "pro v2\n"}, tag="v1.3.0")
+        local = project / ".claude" / "plugins" / "python-development"
+        (local / "agents").mkdir(parents=True)
+        (local / "agents" / "pro.md").write_text("pro\n", encoding="utf-8")
+        write_registry(project / ".claude-plugin" / "registry.json", [
+            upstream_plugin("python-development", "1.2.0", "https://github.com/acme/agents")])
+
+        manager = PluginManager(".claude-plugin/registry.json")
+        assert manager.diff_upstream("python-development", [GitMirrorSource(str(root))]) is None
+        assert "installed version 1.2.0 not available upstream" in capsys.readouterr().out
+
+    def test_unversioned_upstream_at_other_version(self, tmp_path, project, capsys):
+        upstream = tmp_path / "upstream"
+        (upstream / ".claude-plugin").mkdir(parents=True)
+        (upstream / ".claude-plugin" / "marketplace.json").write_text(
+            json.dumps(marketplace(review="1.1.0")), encoding="utf-8")
+        (upstream / "plugins" / "review").mkdir(parents=True)
+        (upstream / "plugins" / "review" / "reviewer.md").write_text("v2\n", encoding="utf-8")
+        (project / ".claude" / "plugins" / "review").mkdir(parents=True)
+        write_registry(project / ".claude-plugin" / "registry.json", [
+            upstream_plugin("review", "1.0.0", upstream.as_uri())])
+
+        assert PluginManager(".claude-plugin/registry.json").diff_upstream("review") is None
+        assert "not available upstream (it provides 1.1.0)" in capsys.readouterr().out
+
+    def test_missing_local_path(self, project, capsys):
+        write_registry(project / ".claude-plugin" / "registry.json", [
+            upstream_plugin("ghost", "1.0.0", "https://github.com/acme/agents")])
+
+        assert PluginManager(".claude-plugin/registry.json").diff_upstream("ghost") is None
+        assert "Cannot compare" in capsys.readouterr().out
+
+
+class TestDependencyOrder:
+    """Topological ordering for bulk operations"""
+
+    def test_dependencies_first_ties_in_input_order(self):
+        graph = {"app": ["core", "utils"], "review": [], "utils": ["core"], "core": []}
+        assert dependency_order(graph) == ["review", "core", "utils", "app"]
+
+    def test_unknown_dependencies_are_ignored(self):
+        assert dependency_order({"app": ["installed-elsewhere"]}) == ["app"]
+
+    def test_cycle(self):
+        with pytest.raises(ValueError, match="a, b"):
+            dependency_order({"a": ["b"], "b": ["a"], "c": []})
+
+
+class TestBulkInstall:
+    """install -r plugins.lock / update --all"""
+
+    @pytest.fixture
+    def project(self, tmp_path, monkeypatch):
+        project = tmp_path / "project"
+        (project / ".claude-plugin").mkdir(parents=True)
+        write_registry(project / ".claude-plugin" / "registry.json", [make_plugin("local-only")])
+        monkeypatch.chdir(project)
+        return project
+
+    @pytest.fixture
+    def upstream(self, mirror):
+        root, publish = mirror
+        publish(marketplace(core="1.0.0", python_development="1.0.0", review="1.0.0"),
+                {"plugins/core/core.md": "core v1",
+                 "plugins/python-development/pro.md": "pro v1",
+                 "plugins/review/reviewer.md": "review v1"}, tag="v1.0.0")
+        publish(marketplace(core="1.1.0", python_development="1.1.0", review="1.1.0"),
+                {"plugins/core/core.md": "core v2",
+                 "plugins/python-development/pro.md": "pro v2"}, tag="v1.1.0")
+        return [GitMirrorSource(str(root))]
+
+    def manager(self, tmp_path, monkeypatch):
+        manager = PluginManager(".claude-plugin/registry.json", store_dir=str(tmp_path / "store"))
+        manager.saves = 0
+        manager.deployed = []
+        save, materialize = manager._save_registry, manager.store.materialize
+
+        def count_save():
+            manager.saves += 1
+            save()
+
+        def record_materialize(tree_hash, dest):
+            manager.deployed.append(dest.name)
+            return materialize(tree_hash, dest)
+
+        monkeypatch.setattr(manager, "_save_registry", count_save)
+        monkeypatch.setattr(manager.store, "materialize", record_materialize)
+        return manager
+
+    def write_lock(self, project, plugins):
+        lock = project / "plugins.lock"
+        lock.write_text(json.dumps({"plugins": plugins}), encoding="utf-8")
+        return str(lock)
+
+    def lock_entry(self, plugin_id, version="1.0.0", dependencies=()):
+        return {"id": plugin_id, "version": version, "source": "https://github.com/acme/agents",
+                "dependencies": list(dependencies)}
+
+    def registry(self, project):
+        registry = json.loads((project / ".claude-plugin" / "registry.json").read_text(encoding="utf-8"))
+        return {p["id"]: p for p in registry["plugins"]}
+
+    def test_install_lock_in_dependency_order(self, tmp_path, project, upstream, monkeypatch):
+        lock = self.write_lock(project, [
+            self.lock_entry("python-development", dependencies=["core"]),
+            self.lock_entry("core", "1.1.0"),
+            self.lock_entry("review"),
+        ])
+        manager = self.manager(tmp_path, monkeypatch)
+
+        assert manager.install_from_lock(lock, upstream, jobs=4)
+
+        deployed = manager.deployed
+        assert sorted(deployed) == ["core", "python-development", "review"]
+        assert deployed.index("core") < deployed.index("python-development")
+        assert manager.saves == 1
+
+        plugins = self.registry(project)
+        assert {pid: p["version"] for pid, p in plugins.items()} == {
+            "local-only": "1.0.0", "python-development": "1.0.0", "core": "1.1.0", "review": "1.0.0"}
+        assert plugins["python-development"]["dependencies"] == ["core"]
+        assert (project / ".claude" / "plugins" / "core" / "core.md").read_text(encoding="utf-8") == "core v2"
+
+        again = self.manager(tmp_path, monkeypatch)
+        assert again.install_from_lock(lock, upstream)
+        assert (again.deployed, again.saves) == ([], 0)
+
+    def test_restore_from_store_without_upstream(self, tmp_path, project, upstream, monkeypatch):
+        lock = self.write_lock(project, [self.lock_entry("core"), self.lock_entry("review")])
+        assert self.manager(tmp_path, monkeypatch).install_from_lock(lock, upstream)
+
+        # Fresh checkout: registry is committed, plugin directories are not
+        shutil.rmtree(project / ".claude" / "plugins")
+
+        manager = self.manager(tmp_path, monkeypatch)
+        assert manager.install_from_lock(lock, sources=[])
+        assert sorted(manager.deployed) == ["core", "review"]
+        assert (project / ".claude" / "plugins" / "review" / "reviewer.md").exists()
+
+    def test_failed_plugin_skips_dependents(self, tmp_path, project, upstream, monkeypatch, capsys):
+        lock = self.write_lock(project, [
+            self.lock_entry("core", "9.9.9"),
+            self.lock_entry("python-development", dependencies=["core"]),
+            self.lock_entry("review"),
+        ])
+        manager = self.manager(tmp_path, monkeypatch)
+
+        assert not manager.install_from_lock(lock, upstream)
+
+        out = capsys.readouterr().out
+        assert "❌ core:" in out
+        assert "python-development skipped: dependency core failed" in out
+        assert manager.deployed == ["review"]
+        assert sorted(self.registry(project)) == ["local-only", "review"]
+
+    def test_cycle_installs_nothing(self, tmp_path, project, upstream, monkeypatch, capsys):
+        lock = self.write_lock(project, [
+            self.lock_entry("core", dependencies=["review"]),
+            self.lock_entry("review", dependencies=["core"]),
+        ])
+        manager = self.manager(tmp_path, monkeypatch)
+
+        assert not manager.install_from_lock(lock, upstream)
+        assert "dependency cycle between core, review" in capsys.readouterr().out
+        assert (manager.deployed, manager.saves) == ([], 0)
+
+    def test_missing_dependency(self, tmp_path, project, upstream, monkeypatch, capsys):
+        lock = self.write_lock(project, [self.lock_entry("review", dependencies=["nowhere"])])
+
+        assert not self.manager(tmp_path, monkeypatch).install_from_lock(lock, upstream)
+        assert "review depends on nowhere" in capsys.readouterr().out
+
+    def test_update_all(self, tmp_path, project, upstream, monkeypatch):
+        lock = self.write_lock(project, [
+            self.lock_entry("python-development", dependencies=["core"]),
+            self.lock_entry("core"),
+            self.lock_entry("review", "1.1.0"),
+        ])
+        assert self.manager(tmp_path, monkeypatch).install_from_lock(lock, upstream)
+
+        manager = self.manager(tmp_path, monkeypatch)
+        assert manager.update_all(upstream)
+
+        assert manager.deployed == ["core", "python-development"]
+        assert manager.saves == 1
+        assert {pid: p["version"] for pid, p in self.registry(project).items()} == {
+            "local-only": "1.0.0", "python-development": "1.1.0", "core": "1.1.0", "review": "1.1.0"}
+
+    def test_unexpected_error_fails_only_that_plugin(self, tmp_path, project, upstream,
+                                                     monkeypatch, capsys):
+        lock = self.write_lock(project, [self.lock_entry("core"), self.lock_entry("review")])
+        manager = self.manager(tmp_path, monkeypatch)
+        fetch_tree = manager._fetch_tree
+
+        def broken_fetch(plugin, version, sources):
+            if plugin["id"] == "core":
+                raise tarfile.ReadError("truncated archive")
+            return fetch_tree(plugin, version, sources)
+
+        monkeypatch.setattr(manager, "_fetch_tree", broken_fetch)
+
+        assert not manager.install_from_lock(lock, upstream)
+
+        assert "❌ core: truncated archive" in capsys.readouterr().out
+        assert manager.saves == 1
+        assert sorted(self.registry(project)) == ["local-only", "review"]
+
+    def test_update_all_keeps_local_changes(self, tmp_path, project, upstream, monkeypatch, capsys):
+        lock = self.write_lock(project, [self.lock_entry("core"), self.lock_entry("review", "1.1.0")])
+        assert self.manager(tmp_path, monkeypatch).install_from_lock(lock, upstream)
+        core_md = project / ".claude" / "plugins" / "core" / "core.md"
+        core_md.write_text("core, tuned", encoding="utf-8")
+        capsys.readouterr()
+
+        assert not self.manager(tmp_path, monkeypatch).update_all(upstream)
+        assert "local changes in .claude/plugins/core (M core.md" in capsys.readouterr().out
+        assert core_md.read_text(encoding="utf-8") == "core, tuned"
+
+        assert self.manager(tmp_path, monkeypatch).update_all(upstream, force=True)
+        assert core_md.read_text(encoding="utf-8") == "core v2"
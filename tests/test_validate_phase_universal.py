@@ -0,0 +1,685 @@
+#!/usr/bin/env python3
+"""
+Tests for the universal phase validator
+
+Usage:
+    pytest tests/test_validate_phase_universal.py -v
+"""
+
+import pytest
+import sys
+import os
+import subprocess
+import io
+import pathlib
+import json
+import time
+
+# scripts 디렉토리를 Python path에 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from validate_phase_universal import (
+    FileIndex,
+    Phase0Validator,
+    Phase1Validator,
+    Phase2Validator,
+    Phase4Validator,
+    ValidationResult,
+    build_coverage_map,
+    combine_results,
+    default_cache_path,
+    parse_phases,
+    read_coverage_reports,
+    run_phases,
+)
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Minimal project tree with one PRD, one task list and paired sources"""
+    prd_dir = tmp_path / "tasks" / "prds"
+    prd_dir.mkdir(parents=True)
+    prd_body = "## 1. Purpose\n## 2. Features\n## 3. Success\n" + "line\n" * 50
+    (prd_dir / "0001-prd-sample.md").write_text(prd_body, encoding="utf-8")
+    (tmp_path / "tasks" / "0001-tasks-sample.md").write_text(
+        "## Task 0.0 Setup\n- [x] branch\n- [x] prd\n\n## Task 1.0\n- [ ] impl\n",
+        encoding="utf-8",
+    )
+
+    (tmp_path / "src" / "auth").mkdir(parents=True)
+    (tmp_path / "src" / "auth" / "oauth.py").write_text("", encoding="utf-8")
+    (tmp_path / "tests" / "auth").mkdir(parents=True)
+    (tmp_path / "tests" / "auth" / "test_oauth.py").write_text("", encoding="utf-8")
+
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestParsePhases:
+    """Phase spec parsing"""
+
+    def test_all_expands_in_canonical_order(self):
+        assert parse_phases("all") == ["0", "0.5", "1", "2", "4"]
+
+    def test_comma_separated_is_sorted_and_deduplicated(self):
+        assert parse_phases("4, 1,0,1") == ["0", "1", "4"]
+
+    def test_single_phase(self):
+        assert parse_phases("0.5") == ["0.5"]
+
+    def test_unknown_phase_raises(self):
+        with pytest.raises(ValueError, match="3"):
+            parse_phases("1,3")
+
+
+class TestCombineResults:
+    """Overall result semantics"""
+
+    def test_all_pass(self):
+        assert combine_results([ValidationResult.PASS] * 3) == ValidationResult.PASS
+
+    def test_warn_without_fail(self):
+        results = [ValidationResult.PASS, ValidationResult.WARN]
+        assert combine_results(results) == ValidationResult.WARN
+
+    def test_fail_wins(self):
+        results = [ValidationResult.WARN, ValidationResult.FAIL, ValidationResult.PASS]
+        assert combine_results(results) == ValidationResult.FAIL
+
+
+class TestRunPhases:
+    """Concurrent multi-phase execution"""
+
+    def test_results_follow_requested_order(self, project):
+        outcomes = run_phases(["0", "0.5", "1"], prd_number="0001", jobs=3)
+
+        assert [phase for phase, _, _ in outcomes] == ["0", "0.5", "1"]
+        assert "Phase 0 (PRD-0001)" in outcomes[0][2]
+        assert "Phase 0.5 (PRD-0001)" in outcomes[1][2]
+        assert "1:1 Test Pairing" in outcomes[2][2]
+
+    def test_results_match_serial_run(self, project):
+        serial = [
+            Phase0Validator().validate("0001"),
+            Phase1Validator().validate(),
+        ]
+        concurrent = [r for _, r, _ in run_phases(["0", "1"], prd_number="0001")]
+
+        assert concurrent == serial == [ValidationResult.PASS, ValidationResult.PASS]
+
+    def test_output_is_buffered_per_phase(self, project, capsys):
+        run_phases(["0", "1"], prd_number="0001")
+
+        assert capsys.readouterr().out == ""
+
+    def test_missing_test_pair_fails_phase_1(self, project):
+        (project / "src" / "auth" / "token.py").write_text("", encoding="utf-8")
+
+        outcomes = run_phases(["0", "1"], prd_number="0001")
+
+        assert outcomes[0][1] == ValidationResult.PASS
+        assert outcomes[1][1] == ValidationResult.FAIL
+        assert "token.py" in outcomes[1][2]
+
+
+def git(*args):
+    """Run git in the current directory"""
+    subprocess.run(["git", *args], check=True, capture_output=True)
+
+
+def commit_all(message):
+    """Stage everything and commit with a throwaway identity"""
+    git("add", "-A")
+    git("-c", "user.name=test", "-c", "user.email=test@example.com",
+        "-c", "commit.gpgsign=false", "commit", "-q", "-m", message)
+
+
+@pytest.fixture
+def git_project(project):
+    """project fixture committed to a throwaway git repository"""
+    git("init", "-q")
+    commit_all("baseline")
+    return project
+
+
+class TestPhase1Incremental:
+    """Phase 1 --since mode"""
+
+    def test_no_changes(self, git_project):
+        validator = Phase1Validator()
+
+        assert validator.validate(since="HEAD") == ValidationResult.PASS
+        assert validator.errors == []
+
+    def test_new_source_without_test_fails(self, git_project, capsys):
+        (git_project / "src" / "auth" / "token.py").write_text("", encoding="utf-8")
+
+        assert Phase1Validator().validate(since="HEAD") == ValidationResult.FAIL
+        assert "token.py" in capsys.readouterr().out
+
+    def test_only_changed_files_are_checked(self, git_project):
+        # Orphan committed before the ref is outside the incremental scope
+        (git_project / "src" / "legacy.py").write_text("", encoding="utf-8")
+        commit_all("legacy")
+        (git_project / "src" / "auth" / "oauth.py").write_text("x = 1\n", encoding="utf-8")
+
+        assert Phase1Validator().validate(since="HEAD") == ValidationResult.PASS
+        assert Phase1Validator().validate() == ValidationResult.FAIL
+
+    def test_deleted_test_orphans_counterpart(self, git_project):
+        (git_project / "tests" / "auth" / "test_oauth.py").unlink()
+
+        validator = Phase1Validator()
+        assert validator.validate(since="HEAD") == ValidationResult.FAIL
+        assert validator.errors == ["Orphaned files without tests: 1"]
+
+    def test_renamed_source_checks_new_pair(self, git_project):
+        git("mv", "src/auth/oauth.py", "src/auth/sso.py")
+
+        assert Phase1Validator().validate(since="HEAD") == ValidationResult.FAIL
+
+        git("mv", "tests/auth/test_oauth.py", "tests/auth/test_sso.py")
+        assert Phase1Validator().validate(since="HEAD") == ValidationResult.PASS
+
+    def test_cache_reused_for_unchanged_files(self, git_project, tmp_path_factory):
+        cache = str(tmp_path_factory.mktemp("cache") / "pairs.json")
+        (git_project / "src" / "legacy.py").write_text("", encoding="utf-8")
+        Phase1Validator().validate(cache_path=cache)
+
+        commit_all("legacy")
+
+        validator = Phase1Validator()
+        assert validator.validate(since="HEAD", cache_path=cache) == ValidationResult.FAIL
+        assert validator.errors == ["Orphaned files without tests: 1"]
+
+        (git_project / "tests" / "test_legacy.py").write_text("", encoding="utf-8")
+        assert Phase1Validator().validate(since="HEAD", cache_path=cache) == ValidationResult.PASS
+
+    def test_cache_covers_commits_before_since(self, git_project, tmp_path_factory):
+        cache = str(tmp_path_factory.mktemp("cache") / "pairs.json")
+        assert Phase1Validator().validate(cache_path=cache) == ValidationResult.PASS
+
+        (git_project / "tests" / "auth" / "test_oauth.py").unlink()
+        commit_all("drop test")
+        (git_project / "README.md").write_text("readme\n", encoding="utf-8")
+        commit_all("docs")
+
+        assert Phase1Validator().validate(since="HEAD~1", cache_path=cache) == ValidationResult.FAIL
+        assert Phase1Validator().validate() == ValidationResult.FAIL
+
+    def test_cache_from_other_branch_is_ignored(self, git_project, tmp_path_factory):
+        cache = str(tmp_path_factory.mktemp("cache") / "pairs.json")
+        git("checkout", "-q", "-b", "side")
+        (git_project / "src" / "legacy.py").write_text("", encoding="utf-8")
+        commit_all("legacy on side")
+        Phase1Validator().validate(cache_path=cache)
+
+        git("checkout", "-q", "-")
+        validator = Phase1Validator()
+        assert validator.validate(since="HEAD", cache_path=cache) == ValidationResult.PASS
+        assert validator.errors == []
+
+    def test_cache_rechecks_files_uncommitted_when_written(self, git_project, tmp_path_factory):
+        cache = str(tmp_path_factory.mktemp("cache") / "pairs.json")
+        (git_project / "src" / "token.py").write_text("", encoding="utf-8")
+        commit_all("token")
+        (git_project / "tests" / "test_token.py").write_text("", encoding="utf-8")
+        assert Phase1Validator().validate(cache_path=cache) == ValidationResult.PASS
+
+        # Test dropped again before ever being committed: invisible to git diff
+        (git_project / "tests" / "test_token.py").unlink()
+
+        assert Phase1Validator().validate(since="HEAD", cache_path=cache) == ValidationResult.FAIL
+
+    def test_invalid_ref_fails(self, git_project):
+        validator = Phase1Validator()
+
+        assert validator.validate(since="no-such-ref") == ValidationResult.FAIL
+        assert "no-such-ref" in validator.errors[0]
+
+
+def write_report(path, files, percent=None):
+    """Write a coverage.py-style JSON report"""
+    report = {
+        "files": {
+            name: {"executed_lines": executed, "missing_lines": missing}
+            for name, (executed, missing) in files.items()
+        },
+        "totals": {"percent_covered": percent if percent is not None else 0.0},
+    }
+    path.write_text(json.dumps(report), encoding="utf-8")
+
+
+class TestCoverageReports:
+    """Coverage read from JSON reports"""
+
+    def test_single_report_uses_totals(self, tmp_path):
+        report = tmp_path / "coverage-0.json"
+        write_report(report, {"src/a.py": ([1, 2], [3])}, percent=84.6)
+
+        assert read_coverage_reports([report]) == 85
+
+    def test_shards_are_merged_by_line_union(self, tmp_path):
+        first, second = tmp_path / "coverage-0.json", tmp_path / "coverage-1.json"
+        write_report(first, {"src/a.py": ([1, 2], [3, 4]), "src/b.py": ([], [1, 2])})
+        write_report(second, {"src/a.py": ([1, 3], [2, 4]), "src/b.py": ([1, 2], [])})
+
+        # a.py: 3/4 lines, b.py: 2/2 lines
+        assert read_coverage_reports([first, second]) == 83
+
+    def test_shards_are_merged_by_branch_union(self, tmp_path):
+        first, second = tmp_path / "coverage-0.json", tmp_path / "coverage-1.json"
+        for path, executed, missing in [(first, [[2, 3]], [[2, 4]]), (second, [[2, 4]], [[2, 3]])]:
+            path.write_text(json.dumps({"files": {"src/a.py": {
+                "executed_lines": [1, 2], "missing_lines": [3, 4],
+                "executed_branches": executed, "missing_branches": missing}}}),
+                encoding="utf-8")
+
+        # 2/4 lines and 2/2 branches
+        assert read_coverage_reports([first, second]) == 67
+
+    def test_merged_total_matches_single_report(self, tmp_path):
+        pytest.importorskip("coverage")
+        script = tmp_path / "mod.py"
+        script.write_text("def f(ok):\n    if ok:\n        return 1\n    return 2\n\n"
+                          "f(True)\n", encoding="utf-8")
+        data, report = tmp_path / ".coverage", tmp_path / "coverage-0.json"
+        env = dict(os.environ, COVERAGE_FILE=str(data))
+        subprocess.run([sys.executable, "-m", "coverage", "run", "--branch", str(script)],
+                       check=True, capture_output=True, cwd=tmp_path, env=env)
+        subprocess.run([sys.executable, "-m", "coverage", "json", "-o", str(report)],
+                       check=True, capture_output=True, cwd=tmp_path, env=env)
+
+        single = read_coverage_reports([report])
+        assert single == read_coverage_reports([report, report]) != 100
+
+    def test_missing_report(self, tmp_path):
+        assert read_coverage_reports([tmp_path / "missing.json"]) is None
+
+
+class TestCoverageMap:
+    """src → tests map from coverage contexts"""
+
+    @pytest.fixture(autouse=True)
+    def needs_coverage(self):
+        pytest.importorskip("coverage")
+
+    def record(self, data_file, script, context=None, branch=False):
+        """Run script under coverage.py, appending to data_file"""
+        cmd = [sys.executable, "-m", "coverage", "run", "-a", "--source=src"]
+        if branch:
+            cmd.append("--branch")
+        if context:
+            cmd.append(f"--context={context}")
+        subprocess.run([*cmd, script], check=True, capture_output=True,
+                       env=dict(os.environ, COVERAGE_FILE=str(data_file)))
+
+    @pytest.mark.parametrize("branch", [False, True])
+    def test_build_from_shards(self, project, branch):
+        (project / "src" / "auth" / "oauth.py").write_text(
+            "def login(ok):\n    if ok:\n        return 1\n    return 2\n\nlogin(True)\n",
+            encoding="utf-8")
+        (project / "src" / "unused.py").write_text("x = 1\n", encoding="utf-8")
+        first, second = project / ".coverage.0", project / ".coverage.1"
+        self.record(first, "src/auth/oauth.py", "tests/auth/test_oauth.py::test_login|run", branch)
+        self.record(first, "src/auth/oauth.py", branch=branch)
+        self.record(second, "src/auth/oauth.py", "tests/test_app.py::TestApp::test_start|run", branch)
+        self.record(second, "src/unused.py", branch=branch)
+
+        assert build_coverage_map([first, second]) == {
+            "src/auth/oauth.py": ["tests/auth/test_oauth.py", "tests/test_app.py"],
+            "src/unused.py": [],
+        }
+
+    def test_unreadable_data_file_is_skipped(self, project):
+        bad = project / ".coverage.0"
+        bad.write_text("not a database", encoding="utf-8")
+
+        assert build_coverage_map([bad]) == {}
+
+
+class FakePytest:
+    """Stand-in for Phase2Validator._run_pytest writing canned coverage reports"""
+
+    def __init__(self, percent=90.0, returncode=0):
+        self.percent = percent
+        self.returncode = returncode
+        self.calls = []
+
+    def __call__(self, targets, tmp_dir, record_contexts):
+        self.calls.append((targets, record_contexts))
+        for i, _ in enumerate(targets):
+            write_report(tmp_dir / f"coverage-{i}.json", {"src/a.py": ([1], [])}, self.percent)
+        return [subprocess.CompletedProcess(["pytest"], self.returncode, "out", "err")
+                for _ in targets]
+
+
+class TestPhase2Python:
+    """Phase 2 Python engine"""
+
+    @pytest.fixture
+    def fake_pytest(self, monkeypatch):
+        fake = FakePytest()
+        monkeypatch.setattr(Phase2Validator, "_run_pytest", fake)
+        return fake
+
+    def write_map(self, project, mapping):
+        path = project / "coverage-map.json"
+        path.write_text(json.dumps({"version": 1, "files": mapping}), encoding="utf-8")
+        return str(path)
+
+    def test_full_run_checks_coverage(self, git_project, fake_pytest):
+        (git_project / "requirements.txt").write_text("", encoding="utf-8")
+
+        assert Phase2Validator().validate(min_coverage=80) == ValidationResult.PASS
+        assert fake_pytest.calls == [([["tests/"]], False)]
+
+    def test_low_coverage_fails(self, git_project, fake_pytest):
+        (git_project / "requirements.txt").write_text("", encoding="utf-8")
+        fake_pytest.percent = 50.0
+
+        validator = Phase2Validator()
+        assert validator.validate(min_coverage=80) == ValidationResult.FAIL
+        assert validator.errors == ["Coverage too low: 50% (minimum 80%)"]
+
+    def test_failing_tests(self, git_project, fake_pytest):
+        (git_project / "requirements.txt").write_text("", encoding="utf-8")
+        fake_pytest.returncode = 1
+
+        validator = Phase2Validator()
+        assert validator.validate(shards=2) == ValidationResult.FAIL
+        assert validator.errors == ["Tests failed"]
+
+    def test_sharding_splits_test_files(self, git_project, fake_pytest):
+        (git_project / "requirements.txt").write_text("", encoding="utf-8")
+        (git_project / "tests" / "auth" / "test_oauth.py").write_text(
+            "def test_login():\n    pass\n", encoding="utf-8")
+        (git_project / "tests" / "test_app.py").write_text(
+            "def test_start():\n    pass\n" + "x = 1\n" * 10, encoding="utf-8")
+        (git_project / "tests" / "test_db.py").write_text(
+            "def test_query():\n    pass\n" + "x = 1\n" * 5, encoding="utf-8")
+
+        assert Phase2Validator().validate(shards=2) == ValidationResult.PASS
+        shards = fake_pytest.calls[0][0]
+        assert sorted(sum(shards, [])) == [
+            "tests/auth/test_oauth.py", "tests/test_app.py", "tests/test_db.py"]
+        assert shards[0] == ["tests/test_app.py"]
+
+    def test_sharding_uses_pytest_collection(self, git_project, fake_pytest):
+        (git_project / "requirements.txt").write_text("", encoding="utf-8")
+        (git_project / "pytest.ini").write_text("[pytest]\npython_files = check_*.py\n",
+                                                encoding="utf-8")
+        (git_project / "tests" / "check_billing.py").write_text(
+            "import pytest\n\n@pytest.mark.parametrize('x', ['a::b'])\n"
+            "def test_charge(x):\n    pass\n", encoding="utf-8")
+        (git_project / "tests" / "check_cli.py").write_text(
+            "def test_run():\n    pass\n", encoding="utf-8")
+
+        assert Phase2Validator().validate(shards=2) == ValidationResult.PASS
+        assert sorted(sum(fake_pytest.calls[0][0], [])) == [
+            "tests/check_billing.py", "tests/check_cli.py"]
+
+    def test_sharding_falls_back_to_patterns(self, git_project, fake_pytest):
+        (git_project / "requirements.txt").write_text("", encoding="utf-8")
+        (git_project / "tests" / "test_broken.py").write_text("def (\n", encoding="utf-8")
+
+        Phase2Validator().validate(shards=2)
+
+        assert sorted(sum(fake_pytest.calls[0][0], [])) == [
+            "tests/auth/test_oauth.py", "tests/test_broken.py"]
+
+    def test_affected_only_runs_mapped_tests(self, git_project, fake_pytest):
+        (git_project / "requirements.txt").write_text("", encoding="utf-8")
+        coverage_map = self.write_map(git_project, {"src/auth/oauth.py": ["tests/auth/test_oauth.py"]})
+        commit_all("map")
+        (git_project / "src" / "auth" / "oauth.py").write_text("x = 1\n", encoding="utf-8")
+        fake_pytest.percent = 10.0  # partial runs do not enforce the threshold
+
+        result = Phase2Validator().validate(since="HEAD", coverage_map=coverage_map)
+
+        assert result == ValidationResult.PASS
+        assert fake_pytest.calls == [([["tests/auth/test_oauth.py"]], False)]
+
+    def test_no_affected_tests_skips_run(self, git_project, fake_pytest):
+        (git_project / "requirements.txt").write_text("", encoding="utf-8")
+        coverage_map = self.write_map(git_project, {"src/auth/oauth.py": ["tests/auth/test_oauth.py"]})
+        commit_all("map")
+
+        assert Phase2Validator().validate(since="HEAD", coverage_map=coverage_map) == ValidationResult.PASS
+        assert fake_pytest.calls == []
+
+    def test_unmapped_source_runs_full_suite(self, git_project, fake_pytest):
+        (git_project / "requirements.txt").write_text("", encoding="utf-8")
+        coverage_map = self.write_map(git_project, {"src/auth/oauth.py": ["tests/auth/test_oauth.py"]})
+        commit_all("map")
+        (git_project / "src" / "billing.py").write_text("", encoding="utf-8")
+
+        Phase2Validator().validate(since="HEAD", coverage_map=coverage_map)
+
+        assert fake_pytest.calls == [([["tests/"]], True)]
+
+    @pytest.mark.parametrize("changed", ["src/data.json", "src/templates/login.html",
+                                         "src/auth/oauth.pyi"])
+    def test_non_python_source_change_runs_full_suite(self, git_project, fake_pytest, changed):
+        (git_project / "requirements.txt").write_text("", encoding="utf-8")
+        coverage_map = self.write_map(git_project, {"src/auth/oauth.py": ["tests/auth/test_oauth.py"]})
+        commit_all("map")
+        (git_project / changed).parent.mkdir(parents=True, exist_ok=True)
+        (git_project / changed).write_text("", encoding="utf-8")
+
+        Phase2Validator().validate(since="HEAD", coverage_map=coverage_map)
+
+        assert fake_pytest.calls == [([["tests/"]], True)]
+
+    def test_source_without_mapped_tests_runs_full_suite(self, git_project, fake_pytest):
+        (git_project / "requirements.txt").write_text("", encoding="utf-8")
+        coverage_map = self.write_map(git_project, {"src/auth/oauth.py": []})
+        commit_all("map")
+        (git_project / "src" / "auth" / "oauth.py").write_text("x = 1\n", encoding="utf-8")
+
+        Phase2Validator().validate(since="HEAD", coverage_map=coverage_map)
+
+        assert fake_pytest.calls == [([["tests/"]], True)]
+
+    @pytest.mark.parametrize("changed", ["conftest.py", "pytest.ini", "pyproject.toml",
+                                         "tests/helpers.py", "tests/data/users.json"])
+    def test_config_or_helper_change_runs_full_suite(self, git_project, fake_pytest, changed):
+        (git_project / "requirements.txt").write_text("", encoding="utf-8")
+        coverage_map = self.write_map(git_project, {"src/auth/oauth.py": ["tests/auth/test_oauth.py"]})
+        commit_all("map")
+        (git_project / changed).parent.mkdir(parents=True, exist_ok=True)
+        (git_project / changed).write_text("", encoding="utf-8")
+
+        Phase2Validator().validate(since="HEAD", coverage_map=coverage_map)
+
+        assert fake_pytest.calls == [([["tests/"]], True)]
+
+    def test_changed_test_file_runs_alone(self, git_project, fake_pytest):
+        (git_project / "requirements.txt").write_text("", encoding="utf-8")
+        coverage_map = self.write_map(git_project, {"src/auth/oauth.py": ["tests/auth/test_oauth.py"]})
+        commit_all("map")
+        (git_project / "tests" / "test_cli.py").write_text("", encoding="utf-8")
+
+        Phase2Validator().validate(since="HEAD", coverage_map=coverage_map)
+
+        assert fake_pytest.calls == [([["tests/test_cli.py"]], False)]
+
+    def test_shards_with_large_output_run_concurrently(self, tmp_path, monkeypatch):
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        fake = bin_dir / "pytest"
+        fake.write_text(f"#!{sys.executable}\n"
+                        "import sys, time\n"
+                        "sys.stdout.write('x' * (1 << 20))\n"
+                        "sys.stdout.flush()\n"
+                        "time.sleep(1)\n", encoding="utf-8")
+        fake.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+        start = time.monotonic()
+        runs = Phase2Validator()._run_pytest([["a"], ["b"], ["c"]], tmp_path, False)
+
+        assert time.monotonic() - start < 2.5
+        assert [len(run.stdout) for run in runs] == [1 << 20] * 3
+        assert all(run.returncode == 0 for run in runs)
+
+class TestFileIndex:
+    """Shared filesystem lookups"""
+
+    def test_glob_is_memoized(self, project):
+        index = FileIndex()
+        first = index.glob("tasks/prds/0001-prd-*.md")
+        (project / "tasks" / "prds" / "0001-prd-other.md").write_text("", encoding="utf-8")
+
+        assert index.glob("tasks/prds/0001-prd-*.md") == first
+
+    def test_exists(self, project):
+        index = FileIndex()
+
+        assert index.exists("tests/auth/test_oauth.py")
+        assert index.exists("tests/auth")
+        assert not index.exists("tests/auth/test_missing.py")
+
+    def test_glob_matches_pathlib(self, project):
+        (project / "src" / "ui").mkdir()
+        (project / "src" / "ui" / "Button.tsx").write_text("", encoding="utf-8")
+        (project / "src" / "main.py").write_text("", encoding="utf-8")
+        index = FileIndex()
+
+        for pattern in ["src/**/*.py", "src/**/*.tsx", "tasks/prds/0001-prd-*.md", "tasks/*.md"]:
+            assert index.glob(pattern) == sorted(pathlib.Path(".").glob(pattern))
+
+    def test_ignored_directories_are_skipped(self, project):
+        (project / "src" / "node_modules" / "lib").mkdir(parents=True)
+        (project / "src" / "node_modules" / "lib" / "index.js").write_text("", encoding="utf-8")
+        index = FileIndex()
+
+        assert index.glob("src/**/*.js") == []
+        # Direct lookups inside ignored directories still hit the filesystem
+        assert index.exists("src/node_modules/lib/index.js")
+
+    def test_cache_skips_unchanged_directories(self, project, tmp_path_factory):
+        cache = tmp_path_factory.mktemp("cache") / "index.json"
+
+        first = FileIndex(cache_path=str(cache))
+        expected = first.glob("src/**/*.py")
+        assert first.rescanned > 0
+        first.save()
+
+        second = FileIndex(cache_path=str(cache))
+        assert second.glob("src/**/*.py") == expected
+        assert second.rescanned == 0
+
+    def test_cache_invalidated_by_directory_mtime(self, project, tmp_path_factory):
+        cache = tmp_path_factory.mktemp("cache") / "index.json"
+        first = FileIndex(cache_path=str(cache))
+        first.glob("src/**/*.py")
+        first.save()
+
+        new_file = project / "src" / "auth" / "token.py"
+        new_file.write_text("", encoding="utf-8")
+        auth_dir = project / "src" / "auth"
+        stat = auth_dir.stat()
+        os.utime(auth_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        index = FileIndex(cache_path=str(cache))
+        assert index.exists("src/auth/token.py")
+        assert index.rescanned == 1
+
+    def test_lookups_read_only_the_directories_they_need(self, project):
+        (project / "dist" / "assets").mkdir(parents=True)
+        (project / "dist" / "assets" / "app.js").write_text("", encoding="utf-8")
+        index = FileIndex()
+
+        assert not index.exists("package.json")
+        assert index.glob("tasks/prds/0001-prd-*.md")
+        assert index.rescanned == 2  # project root and tasks/prds
+
+        index.glob("src/**/*.py")
+        assert index.rescanned == 4  # plus src and src/auth, never dist/
+
+    def test_symlinked_directory(self, project):
+        shared = project / "shared"
+        shared.mkdir()
+        (project / "tests" / "auth" / "test_oauth.py").rename(shared / "test_oauth.py")
+        (project / "tests" / "auth").rmdir()
+        (project / "tests" / "auth").symlink_to(pathlib.Path("..") / "shared")
+        index = FileIndex()
+
+        assert index.exists("tests/auth")
+        assert index.exists("tests/auth/test_oauth.py")
+        assert Phase1Validator(index=index, stream=io.StringIO()).validate() == ValidationResult.PASS
+        # Recursive globs do not descend into symlinked directories, like pathlib
+        assert index.glob("tests/**/*.py") == sorted(pathlib.Path(".").glob("tests/**/*.py"))
+
+
+class TestPhase4:
+    """Working tree / PowerShell checks"""
+
+    def test_powershell_stderr_is_shown(self, project, monkeypatch):
+        (project / "scripts").mkdir()
+        (project / "scripts" / "validate-phase-4.ps1").write_text("", encoding="utf-8")
+        monkeypatch.setattr(sys, "platform", "win32")
+        monkeypatch.setattr(subprocess, "run", lambda cmd, **kwargs: subprocess.CompletedProcess(
+            cmd, 1, "checking...\n", "Write-Error: version mismatch\n"))
+        out = io.StringIO()
+
+        assert Phase4Validator(stream=out).validate() == ValidationResult.FAIL
+        assert "checking..." in out.getvalue()
+        assert "Write-Error: version mismatch" in out.getvalue()
+
+    def test_own_cache_files_are_not_changes(self, git_project):
+        (git_project / ".claude").mkdir()
+        (git_project / ".claude" / "phase-index.json").write_text("{}", encoding="utf-8")
+        own = [".claude/phase-index.json"]
+
+        assert Phase4Validator(stream=io.StringIO()).validate(own_files=own) == ValidationResult.PASS
+
+        (git_project / ".claude" / "notes.md").write_text("", encoding="utf-8")
+        out = io.StringIO()
+        assert Phase4Validator(stream=out).validate(own_files=own) == ValidationResult.FAIL
+        assert ".claude/notes.md" in out.getvalue()
+        assert "phase-index.json" not in out.getvalue()
+
+    def test_default_cache_path_is_outside_work_tree(self, git_project):
+        path = pathlib.Path(default_cache_path("index.json"))
+
+        assert path.parent.parent.resolve() == (git_project / ".git").resolve()
+
+
+class TestCommandLine:
+    """CLI exit codes"""
+
+    SCRIPT = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'validate_phase_universal.py')
+
+    def run(self, *args):
+        return subprocess.run(
+            [sys.executable, os.path.abspath(self.SCRIPT), *args],
+            capture_output=True, text=True, encoding="utf-8",
+        )
+
+    def test_multi_phase_pass_exits_zero(self, project):
+        result = self.run("1,0", "0001")
+
+        assert result.returncode == 0, result.stdout
+        assert result.stdout.index("Phase 0 (") < result.stdout.index("Phase 1 (")
+
+    def test_missing_prd_number_exits_one(self, project):
+        result = self.run("all")
+
+        assert result.returncode == 1
+        assert "PRD number required" in result.stdout
+
+    def test_unknown_phase_exits_one(self, project):
+        result = self.run("7")
+
+        assert result.returncode == 1
+        assert "not yet implemented" in result.stdout
+
+    def test_default_caches_keep_phase_4_clean(self, git_project):
+        for _ in range(2):
+            result = self.run("1,4", "--index-cache", "--pairing-cache")
+
+            assert result.returncode == 0, result.stdout
+        assert (git_project / ".git" / "phase-validator" / "index.json").exists()
+        assert (git_project / ".git" / "phase-validator" / "pairing.json").exists()